@@ -1,37 +1,39 @@
 """Command Line Interface using Typer and Rich."""
 
-from enum import Enum
+import re
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
-from src.engine import apply_lookup, compare_datasets, drop_columns, exclude_values, filter_data, load_data, unpivot_data
-from src.graphs import ChartType, ExportFormat, get_renderer, list_renderers
+# Polars (src.engine) and Plotly/NetworkX (src.graphs) are imported inside the
+# commands that need them so that --help and argument errors stay fast.
+if TYPE_CHECKING:
+    import polars as pl
+
+    from src.graphs import ExportFormat
 
 app = typer.Typer(no_args_is_help=True)
 console = Console()
 
+# Splits comma-separated option values, trimming whitespace around each item
+_CSV_SPLIT = re.compile(r"\s*,\s*").split
 
-class ChartTypeOption(str, Enum):
-    """CLI enum for chart type selection."""
-
-    bar = "bar"
-    line = "line"
-    scatter = "scatter"
-    histogram = "histogram"
-    pie = "pie"
-
+# Choices for --type, --layout and --how; Literal types avoid building Enum classes
+ChartTypeName = Literal["bar", "line", "scatter", "histogram", "pie"]
+LayoutName = Literal["spring", "circular", "kamada_kawai", "shell", "random", "spectral"]
+JoinHowName = Literal["full", "left"]
 
-class LayoutOption(str, Enum):
-    """CLI enum for network layout selection."""
-
-    spring = "spring"
-    circular = "circular"
-    kamada_kawai = "kamada_kawai"
-    shell = "shell"
-    random = "random"
+# Output file suffixes mapped to ExportFormat values
+_EXPORT_SUFFIXES = {
+    ".html": "html",
+    ".png": "png",
+    ".pdf": "pdf",
+    ".svg": "svg",
+}
 
 
 @app.callback()
@@ -41,7 +43,15 @@ def callback() -> None:
 
 
 @app.command()
-def compare(file1: str, file2: str, key: str = "id") -> None:
+def compare(
+    file1: str,
+    file2: str,
+    key: str = "id",
+    how: JoinHowName = "full",
+    low_memory: bool = typer.Option(
+        False, "--low-memory", help="Parse CSV/Parquet with lower peak memory (slower)"
+    ),
+) -> None:
     """
     Compare two datasets and show differences in the terminal.
 
@@ -49,29 +59,40 @@ def compare(file1: str, file2: str, key: str = "id") -> None:
         file1: Path to the first dataset file.
         file2: Path to the second dataset file.
         key: Column name to join datasets on (default: id).
+        how: "full" keeps rows from both files; "left" keeps only rows of
+            file1 (default: full).
+        low_memory: Read CSV and Parquet files with Polars' low_memory option.
     """
+    from src.engine import compare_datasets, execute, load_data
+
     with console.status("[bold green]Loading data..."):
-        df1 = load_data(file1)
-        df2 = load_data(file2)
-        result = compare_datasets(df1, df2, key)
+        df1 = load_data(file1, lazy=True, low_memory=low_memory)
+        df2 = load_data(file2, lazy=True, low_memory=low_memory)
+        result, diff_cols = compare_datasets(df1, df2, key, how)
+        result = execute(result)
+    diff_set = set(diff_cols)
     table = Table(title=f"Comparison: {file1} vs {file2}")
     for col_name in result.columns:
-        style = "bold red" if "diff" in col_name else "white"
+        style = "bold red" if col_name in diff_set else "white"
         table.add_column(col_name, style=style)
-    for row in result.head(20).iter_rows():
-        table.add_row(*[str(x) for x in row])
+    for row in _format_rows(result.head(20)):
+        table.add_row(*row)
     console.print(table)
-    console.print(f"[dim]Showing top 20 of {len(result)} rows[/dim]")
+    console.print(
+        f"[dim]Showing top 20 of {len(result)} rows, {len(diff_cols)} diff columns[/dim]"
+    )
 
 
 @app.command()
 def chart(
     file: str = typer.Argument(..., help="Path to data file (CSV, JSON, Parquet)"),
-    chart_type: ChartTypeOption = typer.Option(
-        ChartTypeOption.bar, "--type", "-t", help="Type of chart to create"
+    chart_type: ChartTypeName = typer.Option(
+        "bar", "--type", "-t", help="Type of chart to create"
     ),
     x: str = typer.Option(..., "--x", "-x", help="Column name for x-axis"),
-    y: list[str] = typer.Option(..., "--y", "-y", help="Column name(s) for y-axis"),
+    y: list[str] = typer.Option(
+        ..., "--y", "-y", help="Column name(s) for y-axis (repeatable, or comma-separated)"
+    ),
     output: str = typer.Option(
         "chart.html", "--output", "-o", help="Output file path"
     ),
@@ -119,6 +140,9 @@ def chart(
     facets: list[str] = typer.Option(
         None, "--facets", help="Column(s) for dropdown selector (repeatable, or comma-separated)"
     ),
+    low_memory: bool = typer.Option(
+        False, "--low-memory", help="Parse CSV/Parquet with lower peak memory (slower)"
+    ),
 ) -> None:
     """
     Create a statistical chart from data file.
@@ -157,6 +181,9 @@ def chart(
         viz chart data.csv --type pie --x category --y value \\
             --facets Country -o chart.html
 
+    Multiple y columns (repeatable or comma-separated):
+        viz chart data.csv --type line --x year --y "sales,costs"
+
     Multi-facet charts (combined dropdown):
         viz chart data.csv --type pie --x category --y value \\
             --facets Country --facets Year -o chart.html
@@ -164,14 +191,54 @@ def chart(
         viz chart data.csv --type pie --x category --y value \\
             --facets "Country,Year" -o chart.html
     """
-    with console.status("[bold green]Loading data..."):
-        df = load_data(file)
-    has_id_cols = id_cols is not None
-    has_value_start = value_start is not None
-    is_unpivot_requested = has_id_cols or has_value_start
-    if is_unpivot_requested:
-        with console.status("[bold yellow]Unpivoting data..."):
-            id_columns = [col.strip() for col in id_cols.split(",")] if id_cols else None
+    from src.engine import (
+        apply_lookup,
+        drop_columns,
+        execute,
+        filter_rows,
+        load_data,
+        unpivot_data,
+    )
+    from src.graphs import ChartType, get_renderer
+
+    if lookup is not None and not all([lookup_column, lookup_code_col, lookup_label_col]):
+        raise typer.BadParameter(
+            "When using --lookup, you must also provide --lookup-column, "
+            "--lookup-code-col, and --lookup-label-col"
+        )
+    facet_columns = _split_repeated(facets) if facets is not None else None
+    y_columns = _split_repeated(y)
+    keep = [_parse_value_filter(expr, "filter") for expr in filter_expr or []]
+    exclude = [_parse_value_filter(expr, "exclude") for expr in exclude_expr or []]
+    columns_to_drop = _split_csv(drop_cols) if drop_cols is not None else []
+    filter_columns = [col for col, _ in keep + exclude]
+    # Without unpivot every column the chart needs is named up front, so CSV
+    # and Parquet files skip the others while parsing. Unpivot picks columns by
+    # position and needs them all.
+    load_columns = None
+    if id_cols is None and value_start is None:
+        referenced = [
+            x, *y_columns, color, *(facet_columns or []), lookup_column, *filter_columns,
+        ]
+        load_columns = list(dict.fromkeys(col for col in referenced if col))
+    output_path = Path(output)
+    export_format = _get_export_format(output_path)
+    chart_type_enum = ChartType(chart_type)
+    # One spinner for the whole pipeline; each stage only updates its message
+    with console.status("[bold green]Loading data...") as status:
+        df = load_data(file, lazy=True, low_memory=low_memory)
+        if load_columns is not None:
+            available = df.collect_schema().names()
+            missing = [col for col in filter_columns + columns_to_drop if col not in available]
+            if missing:
+                raise ValueError(f"Columns not found: {', '.join(dict.fromkeys(missing))}")
+            # Names missing from the file are left to apply_lookup and the
+            # renderer to report; dropped columns are only kept for filters
+            df = df.select([col for col in load_columns if col in available])
+            columns_to_drop = [col for col in columns_to_drop if col in load_columns]
+        if id_cols is not None or value_start is not None:
+            status.update("[bold yellow]Unpivoting data...")
+            id_columns = _split_csv(id_cols) if id_cols else None
             df = unpivot_data(
                 df=df,
                 id_columns=id_columns,
@@ -180,14 +247,11 @@ def chart(
                 variable_name=var_name,
                 value_name=value_name,
             )
-    if lookup is not None:
-        if not all([lookup_column, lookup_code_col, lookup_label_col]):
-            raise typer.BadParameter(
-                "When using --lookup, you must also provide --lookup-column, "
-                "--lookup-code-col, and --lookup-label-col"
-            )
-        with console.status("[bold cyan]Applying lookup..."):
-            lookup_df = load_data(lookup)
+        if lookup is not None:
+            status.update("[bold cyan]Applying lookup...")
+            # apply_lookup selects the code and label columns, which a lazy
+            # scan pushes down into the reader
+            lookup_df = load_data(lookup, lazy=True, low_memory=low_memory)
             df = apply_lookup(
                 df=df,
                 lookup_df=lookup_df,
@@ -195,45 +259,20 @@ def chart(
                 code_column=lookup_code_col,
                 label_column=lookup_label_col,
             )
-    if filter_expr is not None:
-        with console.status("[bold magenta]Filtering data..."):
-            for expr in filter_expr:
-                if ":" not in expr:
-                    raise typer.BadParameter(
-                        f"Invalid filter format: '{expr}'. Use COL:VAL1,VAL2,..."
-                    )
-                col, values_str = expr.split(":", 1)
-                values = [v.strip() for v in values_str.split(",")]
-                df = filter_data(df=df, column=col, values=values)
-    if exclude_expr is not None:
-        with console.status("[bold red]Excluding values..."):
-            for expr in exclude_expr:
-                if ":" not in expr:
-                    raise typer.BadParameter(
-                        f"Invalid exclude format: '{expr}'. Use COL:VAL1,VAL2,..."
-                    )
-                col, values_str = expr.split(":", 1)
-                values = [v.strip() for v in values_str.split(",")]
-                df = exclude_values(df=df, column=col, values=values)
-    if drop_cols is not None:
-        with console.status("[bold yellow]Dropping columns..."):
-            columns_to_drop = [col.strip() for col in drop_cols.split(",")]
+        if filter_expr is not None or exclude_expr is not None:
+            status.update("[bold magenta]Filtering data...")
+            df = filter_rows(df=df, keep=keep, exclude=exclude)
+        if drop_cols is not None:
+            status.update("[bold yellow]Dropping columns...")
             df = drop_columns(df=df, columns=columns_to_drop)
-    facet_columns = None
-    if facets is not None:
-        facet_columns = []
-        for facet_item in facets:
-            facet_columns.extend([col.strip() for col in facet_item.split(",")])
-    output_path = Path(output)
-    export_format = _get_export_format(output_path)
-    chart_type_enum = ChartType(chart_type.value)
-    with console.status("[bold blue]Creating chart..."):
+        status.update("[bold blue]Creating chart...")
+        df = execute(df)
         graph_renderer = get_renderer(renderer)
         fig = graph_renderer.create_chart(
             df=df,
             chart_type=chart_type_enum,
             x=x,
-            y=y,
+            y=y_columns,
             title=title,
             color=color,
             facet_columns=facet_columns,
@@ -252,12 +291,15 @@ def network(
     ),
     weight: str = typer.Option(None, "--weight", "-w", help="Column for edge weights"),
     title: str = typer.Option(None, "--title", help="Graph title"),
-    layout: LayoutOption = typer.Option(
-        LayoutOption.spring, "--layout", "-l", help="Layout algorithm"
+    layout: LayoutName = typer.Option(
+        "spring", "--layout", "-l", help="Layout algorithm"
     ),
     renderer: str = typer.Option(
         "plotly", "--renderer", "-r", help="Renderer to use"
     ),
+    low_memory: bool = typer.Option(
+        False, "--low-memory", help="Parse CSV/Parquet with lower peak memory (slower)"
+    ),
 ) -> None:
     """
     Create a network graph from edge list data.
@@ -269,11 +311,19 @@ def network(
         viz network edges.csv --source from --target to --output graph.html
         viz network edges.csv --source a --target b --weight w --layout circular
     """
-    with console.status("[bold green]Loading data..."):
-        df = load_data(file)
+    from src.engine import execute, load_data
+    from src.graphs import get_renderer
+
     output_path = Path(output)
     export_format = _get_export_format(output_path)
-    with console.status("[bold blue]Creating network graph..."):
+    with console.status("[bold green]Loading data...") as status:
+        # Only the edge columns are decoded for CSV and Parquet files; names
+        # missing from the file (such as an absent weight) are not selected
+        scan = load_data(file, lazy=True, low_memory=low_memory)
+        available = scan.collect_schema().names()
+        edge_columns = dict.fromkeys(col for col in (source, target, weight) if col)
+        df = execute(scan.select([col for col in edge_columns if col in available]))
+        status.update("[bold blue]Creating network graph...")
         graph_renderer = get_renderer(renderer)
         fig = graph_renderer.create_network(
             df=df,
@@ -281,7 +331,7 @@ def network(
             target=target,
             weight=weight,
             title=title,
-            layout=layout.value,
+            layout=layout,
         )
         graph_renderer.export(fig, str(output_path), export_format)
     console.print(f"[green]✓[/green] Network graph saved to: [bold]{output_path}[/bold]")
@@ -290,27 +340,75 @@ def network(
 @app.command()
 def renderers() -> None:
     """List available graph renderers."""
+    from src.graphs import list_renderers
+
     available = list_renderers()
     console.print("[bold]Available renderers:[/bold]")
     for name in available:
         console.print(f"  • {name}")
 
 
-def _get_export_format(path: Path) -> ExportFormat:
+def _get_export_format(path: Path) -> "ExportFormat":
     """Determine export format from file extension."""
-    suffix = path.suffix.lower()
-    format_map = {
-        ".html": ExportFormat.HTML,
-        ".png": ExportFormat.PNG,
-        ".pdf": ExportFormat.PDF,
-        ".svg": ExportFormat.SVG,
-    }
-    if suffix not in format_map:
+    return _suffix_to_format(path.suffix.lower())
+
+
+@cache
+def _suffix_to_format(suffix: str) -> "ExportFormat":
+    """Resolve a lower-cased file suffix to its ExportFormat."""
+    from src.graphs import ExportFormat
+
+    if suffix not in _EXPORT_SUFFIXES:
         raise typer.BadParameter(
             f"Unsupported output format: {suffix}. "
-            f"Supported: {', '.join(format_map.keys())}"
+            f"Supported: {', '.join(_EXPORT_SUFFIXES.keys())}"
+        )
+    return ExportFormat(_EXPORT_SUFFIXES[suffix])
+
+
+def _format_rows(df: "pl.DataFrame") -> list[tuple[str, ...]]:
+    """
+    Format every cell as str() would, for a Rich table.
+
+    Scalar columns are cast in Polars instead of calling str() per cell.
+    Booleans are spelled True/False, and nested values (lists, structs)
+    are formatted from their Python values because Polars cannot cast them
+    to strings. Nulls are shown as "None".
+    """
+    import polars as pl
+
+    columns = []
+    for name, dtype in df.schema.items():
+        if dtype.is_nested() or dtype == pl.Object:
+            columns.append(pl.Series(name, [str(value) for value in df[name].to_list()]))
+        elif dtype == pl.Boolean:
+            columns.append(
+                df[name].replace_strict({True: "True", False: "False"}, return_dtype=pl.Utf8)
+                .fill_null("None")
+            )
+        else:
+            columns.append(df[name].cast(pl.Utf8).fill_null("None"))
+    return pl.DataFrame(columns).rows()
+
+
+def _split_csv(value: str) -> list[str]:
+    """Split a comma-separated option value into stripped items."""
+    return _CSV_SPLIT(value.strip())
+
+
+def _split_repeated(values: list[str]) -> list[str]:
+    """Flatten a repeatable option whose values may also be comma-separated."""
+    return [item for value in values for item in _split_csv(value)]
+
+
+def _parse_value_filter(expr: str, kind: str) -> tuple[str, list[str]]:
+    """Parse a COL:VAL1,VAL2,... expression into a column and its values."""
+    if ":" not in expr:
+        raise typer.BadParameter(
+            f"Invalid {kind} format: '{expr}'. Use COL:VAL1,VAL2,..."
         )
-    return format_map[suffix]
+    col, values_str = expr.split(":", 1)
+    return col, _split_csv(values_str)
 
 
 if __name__ == "__main__":
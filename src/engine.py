@@ -1,83 +1,259 @@
 """Core data processing engine using Polars."""
 
+import hashlib
+import os
+import tempfile
+from functools import cache, lru_cache
 from io import BytesIO
-from typing import BinaryIO
+from pathlib import Path
+from typing import BinaryIO, Literal, TypeVar
 
+import numpy as np
 import polars as pl
 
-
-def load_data(source: str | BinaryIO) -> pl.DataFrame:
+# Pipeline helpers accept eager or lazy frames and return the same kind
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Parsed files are cached as Arrow IPC when VIZ_CACHE=1
+_CACHE_DIR = Path(os.environ.get("VIZ_CACHE_DIR", Path.home() / ".cache" / "viz-tool"))
+
+# Readers by file extension
+_READERS = {
+    ".csv": pl.read_csv,
+    ".json": pl.read_json,
+    ".parquet": pl.read_parquet,
+}
+# Lazy scanners for the formats that support them
+_SCANNERS = {
+    ".csv": pl.scan_csv,
+    ".parquet": pl.scan_parquet,
+}
+# Above this many value columns unpivot_data unpivots in column chunks
+_UNPIVOT_CHUNK_THRESHOLD = 1000
+
+# Readers that accept low_memory, which trades parse speed for lower peak memory
+_LOW_MEMORY_READERS = {".csv", ".parquet"}
+# Readers that can skip unrequested columns while parsing
+_COLUMN_READERS = {".csv", ".parquet"}
+# Integer types whose differences can exceed Int64, so compare_datasets diffs them as Float64
+_WIDE_INTEGER_TYPES = {pl.Int64, pl.UInt64}
+
+
+def load_data(
+    source: str | BinaryIO,
+    lazy: bool = False,
+    low_memory: bool = False,
+    columns: list[str] | None = None,
+) -> pl.DataFrame | pl.LazyFrame:
     """
     Reads CSV, JSON, or Parquet automatically based on file extension.
 
     Supports both file paths (for CLI) and file-like objects (for Streamlit).
-    
+
+    Set VIZ_CACHE=1 to cache parsed file paths as Arrow IPC files keyed by a
+    SHA-512 of the file contents (in VIZ_CACHE_DIR, default ~/.cache/viz-tool).
+    Repeat loads of unchanged files then skip parsing and are memory-mapped.
+
+    Within one process, path loads are also memoized (keyed by path and
+    modification time) unless VIZ_NO_CACHE=1 is set.
+
     Args:
         source: Path to the data file or a file-like object with a .name attribute.
-        
+        lazy: If True, return a LazyFrame. CSV and Parquet paths are scanned so
+            later filters and column selections are pushed down into the reader.
+            JSON and file-like sources are read eagerly and wrapped.
+        low_memory: If True, CSV and Parquet are read with Polars'
+            low_memory option, which lowers peak memory but parses more
+            slowly.
+        columns: Optional subset of columns to load, in the order given. CSV
+            and Parquet skip the other columns while reading; JSON is read in
+            full and then narrowed.
+
     Returns:
-        A Polars DataFrame containing the loaded data.
-        
+        A Polars DataFrame (or LazyFrame when lazy=True) containing the data.
+
     Raises:
         ValueError: If the file format is unsupported.
     """
+    column_key = tuple(columns) if columns else None
+    if isinstance(source, str) and os.environ.get("VIZ_NO_CACHE") != "1":
+        mtime_ns = os.stat(source).st_mtime_ns
+        return _load_path(source, mtime_ns, lazy, low_memory, column_key)
+    return _load_uncached(source, lazy, low_memory, column_key)
+
+
+def clear_data_cache() -> None:
+    """Drop all frames memoized by load_data in this process."""
+    _load_path.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _load_path(
+    filepath: str,
+    mtime_ns: int,
+    lazy: bool,
+    low_memory: bool,
+    columns: tuple[str, ...] | None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Memoized path load; mtime_ns is part of the key so edited files reload."""
+    return _load_uncached(filepath, lazy, low_memory, columns)
+
+
+def _load_uncached(
+    source: str | BinaryIO,
+    lazy: bool,
+    low_memory: bool,
+    columns: tuple[str, ...] | None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Load a source, going through the IPC cache for paths when enabled."""
+    if isinstance(source, str) and os.environ.get("VIZ_CACHE") == "1":
+        return _load_cached(source, lazy, low_memory, columns)
+    return _read_source(source, lazy, low_memory, columns)
+
+
+def _read_source(
+    source: str | BinaryIO,
+    lazy: bool,
+    low_memory: bool,
+    columns: tuple[str, ...] | None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Parse a file path or file-like object with the reader for its extension."""
+    filename = source if isinstance(source, str) else getattr(source, "name", "")
+    suffix = Path(filename).suffix.lower()
+    reader = _READERS.get(suffix)
+    if reader is None:
+        raise ValueError(f"Unsupported format: {filename}")
+    options: dict[str, bool] = {}
+    if low_memory and suffix in _LOW_MEMORY_READERS:
+        options["low_memory"] = True
     if isinstance(source, str):
-        filename = source
+        if lazy and suffix in _SCANNERS:
+            scan = _SCANNERS[suffix](source, **options)
+            return scan.select(columns) if columns else scan
+        file_source = source
+    elif getattr(source, "seekable", lambda: False)():
+        # Readers accept seekable file objects, so avoid copying the upload
+        source.seek(0)
         file_source = source
     else:
-        filename = getattr(source, "name", "")
         file_source = BytesIO(source.read())
-    filename_lower = filename.lower()
-    if filename_lower.endswith(".csv"):
-        return pl.read_csv(file_source)
-    elif filename_lower.endswith(".json"):
-        return pl.read_json(file_source)
-    elif filename_lower.endswith(".parquet"):
-        return pl.read_parquet(file_source)
-    else:
-        raise ValueError(f"Unsupported format: {filename}")
-
-
-def compare_datasets(df_a: pl.DataFrame, df_b: pl.DataFrame, join_key: str) -> pl.DataFrame:
+    if columns and suffix in _COLUMN_READERS:
+        options = {**options, "columns": list(columns)}
+    df = reader(file_source, **options)
+    if columns:
+        df = df.select(columns)
+    return df.lazy() if lazy else df
+
+
+def _cache_path(filepath: str) -> Path:
+    """Return the IPC cache location for a file, keyed by its content hash."""
+    with open(filepath, "rb") as file:
+        digest = hashlib.file_digest(file, "sha512").hexdigest()
+    extension = Path(filepath).suffix.lower().lstrip(".")
+    return _CACHE_DIR / f"{digest}.{extension}.arrow"
+
+
+def _load_cached(
+    filepath: str, lazy: bool, low_memory: bool, columns: tuple[str, ...] | None
+) -> pl.DataFrame | pl.LazyFrame:
+    """Load a file through the content-addressed IPC cache."""
+    cache_path = _cache_path(filepath)
+    if not cache_path.exists():
+        # The cache holds the whole file; the column subset is taken afterwards
+        df = _read_source(filepath, lazy=False, low_memory=low_memory, columns=None)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a uniquely named temporary file first so readers never see
+        # a partial cache and concurrent loads of the same file do not clash
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, suffix=".tmp", delete=False
+        ) as tmp_file:
+            try:
+                df.write_ipc(tmp_file)
+            except BaseException:
+                tmp_file.close()
+                os.unlink(tmp_file.name)
+                raise
+        os.replace(tmp_file.name, cache_path)
+        if columns:
+            df = df.select(columns)
+        return df.lazy() if lazy else df
+    if lazy:
+        scan = pl.scan_ipc(cache_path)
+        return scan.select(columns) if columns else scan
+    df = pl.read_ipc(cache_path, memory_map=True)
+    return df.select(columns) if columns else df
+
+
+def compare_datasets(
+    df_a: FrameT, df_b: FrameT, join_key: str, how: Literal["full", "left"] = "full"
+) -> tuple[FrameT, list[str]]:
     """
     Creates a complex comparison table by joining two datasets.
     
     Joins two datasets on the specified key and calculates differences
-    for all numeric columns.
+    for all numeric columns. The join and the diff expressions form one
+    plan; LazyFrame inputs are returned uncollected.
     
     Args:
-        df_a: First DataFrame to compare.
-        df_b: Second DataFrame to compare.
+        df_a: First DataFrame or LazyFrame to compare.
+        df_b: Second frame to compare (same kind as df_a).
         join_key: Column name to join on.
+        how: "full" keeps rows from both datasets; "left" keeps only rows of
+            df_a, which builds a smaller join when rows only in df_b are not
+            needed.
         
     Returns:
-        A DataFrame containing joined data with difference columns.
+        A tuple of the joined frame (same kind as df_a) and the names of its
+        difference columns, in column order. The join key appears once.
     """
-    # suffix="_b" distinguishes the second dataset columns
-    joined = df_a.join(df_b, on=join_key, how="outer", suffix="_b")
+    schema_a = df_a.collect_schema()
+    schema_b = df_b.collect_schema()
     # Find numeric columns to calculate diffs
     numeric_cols = [
-        col for col in df_a.columns
-        if col in df_b.columns and df_a[col].dtype in (pl.Int64, pl.Float64)
-        and col != join_key
+        col for col, dtype in schema_a.items()
+        if col != join_key and col in schema_b and dtype.is_numeric()
     ]
-    # Add difference columns dynamically
-    expressions = [pl.all()]
-    for col in numeric_cols:
-        # Diff = Value A - Value B
-        diff_expr = (pl.col(col) - pl.col(f"{col}_b")).alias(f"{col}_diff")
-        expressions.append(diff_expr)
-    return joined.select(expressions)
+    # Diff = Value A - Value B
+    diff_cols = [f"{col}_diff" for col in numeric_cols]
+    diff_exprs = [
+        (_diff_operand(col, schema_a[col]) - _diff_operand(f"{col}_b", schema_b[col])).alias(diff_col)
+        for col, diff_col in zip(numeric_cols, diff_cols)
+    ]
+    # suffix="_b" distinguishes the second dataset columns; coalescing keeps
+    # a single join key column filled from whichever side has the row
+    result = (
+        df_a.lazy()
+        .join(df_b.lazy(), on=join_key, how=how, suffix="_b", coalesce=True)
+        .with_columns(diff_exprs)
+    )
+    if isinstance(df_a, pl.DataFrame):
+        return result.collect(), diff_cols
+    return result, diff_cols
+
+
+def _diff_operand(column: str, dtype: pl.DataType) -> pl.Expr:
+    """
+    Cast a column for subtraction so the difference cannot wrap around.
+
+    Integers narrower than 64 bits (where 1 - 2 would wrap for unsigned
+    types) become Int64, which holds any of their differences exactly.
+    64-bit integers, floats and decimals become Float64: a UInt64 above
+    Int64's range cannot be cast to Int64, and subtracting Int64 extremes
+    would overflow, so those differences trade precision for range.
+    """
+    if dtype.is_integer() and dtype not in _WIDE_INTEGER_TYPES:
+        return pl.col(column).cast(pl.Int64)
+    return pl.col(column).cast(pl.Float64)
 
 
 def unpivot_data(
-    df: pl.DataFrame,
+    df: FrameT,
     id_columns: list[str] | None = None,
     value_columns_start: int | None = None,
     value_columns_end: int | None = None,
     variable_name: str = "variable",
     value_name: str = "value",
-) -> pl.DataFrame:
+) -> FrameT:
     """
     Transform wide-format data to long format by unpivoting columns.
 
@@ -88,8 +264,12 @@ def unpivot_data(
     - Specify id_columns: remaining columns become value columns
     - Specify value_columns_start (and optionally end): remaining columns become id columns
 
+    The long result is len(value_columns) times taller than the input, so
+    filter and drop columns before unpivoting where possible. Very wide
+    inputs are unpivoted in column chunks that are concatenated in order.
+
     Args:
-        df: Source DataFrame in wide format.
+        df: Source DataFrame or LazyFrame in wide format.
         id_columns: Column names to keep as identifiers. If provided, all other
             columns are treated as value columns.
         value_columns_start: Start index for value columns (0-based, inclusive).
@@ -99,13 +279,13 @@ def unpivot_data(
         value_name: Name for the new column containing the values.
 
     Returns:
-        A DataFrame in long format with unpivoted data.
+        A frame of the same kind as df in long format with unpivoted data.
 
     Raises:
         ValueError: If neither id_columns nor value_columns_start is provided,
             or if column indices are invalid.
     """
-    all_columns = df.columns
+    all_columns = df.collect_schema().names()
     has_id_cols = id_columns is not None and len(id_columns) > 0
     has_value_start = value_columns_start is not None
     if not has_id_cols and not has_value_start:
@@ -123,74 +303,83 @@ def unpivot_data(
             raise ValueError("value_columns_start must be less than value_columns_end")
         value_columns = all_columns[value_columns_start:value_columns_end]
         if not has_id_cols:
-            id_columns = [col for col in all_columns if col not in value_columns]
+            # Set membership keeps this linear for very wide frames
+            value_set = set(value_columns)
+            id_columns = [col for col in all_columns if col not in value_set]
     else:
-        value_columns = [col for col in all_columns if col not in id_columns]
-    return df.unpivot(
-        on=value_columns,
-        index=id_columns,
-        variable_name=variable_name,
-        value_name=value_name,
-    )
+        id_set = set(id_columns)
+        value_columns = [col for col in all_columns if col not in id_set]
+    unpivot_options = {
+        "index": id_columns,
+        "variable_name": variable_name,
+        "value_name": value_name,
+    }
+    if len(value_columns) <= _UNPIVOT_CHUNK_THRESHOLD:
+        return df.unpivot(on=value_columns, **unpivot_options)
+    chunk_count = os.cpu_count() or 1
+    chunk_size = -(-len(value_columns) // chunk_count)
+    parts = [
+        df.unpivot(on=value_columns[start:start + chunk_size], **unpivot_options)
+        for start in range(0, len(value_columns), chunk_size)
+    ]
+    return pl.concat(parts, how="vertical_relaxed", rechunk=False)
 
 
 def apply_lookup(
-    df: pl.DataFrame,
-    lookup_df: pl.DataFrame,
+    df: FrameT,
+    lookup_df: FrameT,
     source_column: str,
     code_column: str,
     label_column: str,
-) -> pl.DataFrame:
+) -> FrameT:
     """
     Replace codes with labels using a lookup table.
 
     Joins the main DataFrame with a lookup DataFrame to replace code values
     with their corresponding labels. The original column is replaced with
-    the label values while keeping the original column name.
+    the label values while keeping the original column name. Codes without
+    a label keep their original value; if a code appears more than once in
+    the lookup, its first label is used.
 
     Args:
-        df: Source DataFrame containing codes to be replaced.
-        lookup_df: Lookup DataFrame containing code-to-label mappings.
+        df: Source DataFrame or LazyFrame containing codes to be replaced.
+        lookup_df: Lookup frame (same kind as df) with code-to-label mappings.
         source_column: Column name in df containing codes to replace.
         code_column: Column name in lookup_df containing the codes.
         label_column: Column name in lookup_df containing the labels.
 
     Returns:
-        A DataFrame with codes replaced by labels in the source column.
+        A frame of the same kind as df with codes replaced by labels.
 
     Raises:
         ValueError: If any of the specified columns do not exist.
     """
-    if source_column not in df.columns:
+    lookup_columns = lookup_df.collect_schema().names()
+    if source_column not in df.collect_schema().names():
         raise ValueError(f"Source column '{source_column}' not found in data")
-    if code_column not in lookup_df.columns:
+    if code_column not in lookup_columns:
         raise ValueError(f"Code column '{code_column}' not found in lookup")
-    if label_column not in lookup_df.columns:
+    if label_column not in lookup_columns:
         raise ValueError(f"Label column '{label_column}' not found in lookup")
-    lookup_subset = lookup_df.select([code_column, label_column]).unique()
-    result = df.join(
-        lookup_subset,
-        left_on=source_column,
-        right_on=code_column,
-        how="left",
-    )
-    result = result.with_columns(
-        pl.when(pl.col(label_column).is_not_null())
-        .then(pl.col(label_column))
-        .otherwise(pl.col(source_column))
-        .alias(source_column)
+    # Private names keep lookup columns from colliding with columns in df;
+    # one label per code stops duplicate codes from multiplying rows
+    lookup_subset = lookup_df.select(
+        pl.col(code_column).alias("__lookup_code"),
+        pl.col(label_column).alias("__lookup_label"),
+    ).unique(subset="__lookup_code", keep="first", maintain_order=True)
+    # Fall back to the original code where the lookup has no label
+    return (
+        df.join(lookup_subset, left_on=source_column, right_on="__lookup_code", how="left")
+        .with_columns(pl.coalesce("__lookup_label", source_column).alias(source_column))
+        .drop("__lookup_label")
     )
-    columns_to_drop = [label_column]
-    if code_column != source_column and code_column in result.columns:
-        columns_to_drop.append(code_column)
-    return result.drop(columns_to_drop)
 
 
 def filter_data(
-    df: pl.DataFrame,
+    df: FrameT,
     column: str,
     values: list[str],
-) -> pl.DataFrame:
+) -> FrameT:
     """
     Filter DataFrame rows by column values.
 
@@ -198,26 +387,27 @@ def filter_data(
     of allowed values.
 
     Args:
-        df: Source DataFrame to filter.
+        df: Source DataFrame or LazyFrame to filter.
         column: Column name to filter on.
         values: List of values to keep.
 
     Returns:
-        A filtered DataFrame containing only matching rows.
+        A filtered frame of the same kind containing only matching rows.
 
     Raises:
         ValueError: If the column does not exist in the DataFrame.
     """
-    if column not in df.columns:
+    schema = df.collect_schema()
+    if column not in schema:
         raise ValueError(f"Column '{column}' not found in data")
-    return df.filter(pl.col(column).cast(pl.Utf8).is_in(values))
+    return df.filter(_value_match_expr(column, values, schema[column]))
 
 
 def exclude_values(
-    df: pl.DataFrame,
+    df: FrameT,
     column: str,
     values: list[str],
-) -> pl.DataFrame:
+) -> FrameT:
     """
     Exclude rows with specific column values from DataFrame.
 
@@ -225,25 +415,83 @@ def exclude_values(
     of values to exclude.
 
     Args:
-        df: Source DataFrame to filter.
+        df: Source DataFrame or LazyFrame to filter.
         column: Column name to filter on.
         values: List of values to exclude.
 
     Returns:
-        A filtered DataFrame with matching rows removed.
+        A filtered frame of the same kind with matching rows removed.
 
     Raises:
         ValueError: If the column does not exist in the DataFrame.
     """
-    if column not in df.columns:
+    schema = df.collect_schema()
+    if column not in schema:
         raise ValueError(f"Column '{column}' not found in data")
-    return df.filter(~pl.col(column).cast(pl.Utf8).is_in(values))
+    return df.filter(~_value_match_expr(column, values, schema[column]))
+
+
+def filter_rows(
+    df: FrameT,
+    keep: list[tuple[str, list[str]]] | None = None,
+    exclude: list[tuple[str, list[str]]] | None = None,
+) -> FrameT:
+    """
+    Apply several keep/exclude conditions in a single filter pass.
+
+    Equivalent to chaining filter_data for every keep condition and
+    exclude_values for every exclude condition, but combines them into one
+    predicate so the frame is scanned once.
+
+    Args:
+        df: Source DataFrame or LazyFrame to filter.
+        keep: (column, values) pairs; rows must match every pair to be kept.
+        exclude: (column, values) pairs; rows matching any pair are removed.
+
+    Returns:
+        A filtered frame of the same kind.
+
+    Raises:
+        ValueError: If any referenced column does not exist in the DataFrame.
+    """
+    keep = keep or []
+    exclude = exclude or []
+    schema = df.collect_schema()
+    missing = [column for column, _ in keep + exclude if column not in schema]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(missing)}")
+    predicates = [
+        _value_match_expr(column, values, schema[column]) for column, values in keep
+    ]
+    predicates += [
+        ~_value_match_expr(column, values, schema[column]) for column, values in exclude
+    ]
+    if not predicates:
+        return df
+    return df.filter(pl.all_horizontal(predicates))
+
+
+def _value_match_expr(column: str, values: list[str], dtype: pl.DataType) -> pl.Expr:
+    """
+    Build an expression matching rows whose column value is in values.
+
+    String and categorical columns are compared directly, and numeric
+    columns against the values parsed to the column dtype (values that do
+    not parse are dropped), so the column itself is never cast. Other dtypes
+    fall back to comparing the column as text.
+    """
+    if dtype == pl.Utf8 or dtype == pl.Categorical:
+        return pl.col(column).is_in(values)
+    if dtype.is_numeric():
+        typed_values = pl.Series(values, dtype=pl.Utf8).cast(dtype, strict=False)
+        return pl.col(column).is_in(typed_values.drop_nulls().to_list())
+    return pl.col(column).cast(pl.Utf8).is_in(values)
 
 
 def drop_columns(
-    df: pl.DataFrame,
+    df: FrameT,
     columns: list[str],
-) -> pl.DataFrame:
+) -> FrameT:
     """
     Drop specified columns from DataFrame.
 
@@ -251,17 +499,167 @@ def drop_columns(
     columns like "Total" or metadata columns when visualizing.
 
     Args:
-        df: Source DataFrame.
+        df: Source DataFrame or LazyFrame.
         columns: List of column names to drop.
 
     Returns:
-        A DataFrame with specified columns removed.
+        A frame of the same kind with specified columns removed.
 
     Raises:
         ValueError: If any column does not exist in the DataFrame.
     """
-    missing = [col for col in columns if col not in df.columns]
+    existing = df.collect_schema().names()
+    missing = [col for col in columns if col not in existing]
     if missing:
         raise ValueError(f"Columns not found: {', '.join(missing)}")
     return df.drop(columns)
 
+
+def lttb_downsample(
+    df: pl.DataFrame,
+    x: str,
+    y: str,
+    *,
+    n_out: int = 3000,
+    group: list[str] | None = None,
+) -> pl.DataFrame:
+    """
+    Reduce a line or scatter series to about n_out rows for plotting.
+
+    Series sorted by x use Largest-Triangle-Three-Buckets, which keeps the
+    first and last points and, from each bucket in between, the point that
+    best preserves the visual shape (peaks and dips survive). Series not
+    sorted by x, or with a non-numeric x, get evenly spaced rows instead.
+    Rows with a null or NaN x or y are dropped. Whole rows are kept, so other
+    columns (hover data, color) stay aligned, and row order is preserved.
+
+    Args:
+        df: Source DataFrame.
+        x: Column name for the x-axis.
+        y: Numeric column name for the y-axis.
+        n_out: Maximum number of rows, shared across groups by size. Groups
+            too small for a proportional share get one row each while the
+            budget lasts, so with more groups than n_out some are dropped.
+        group: Optional columns (such as color or facet columns) whose
+            groups are downsampled separately so each keeps its own shape.
+
+    Returns:
+        At most n_out selected rows of df (none when every x or y is missing),
+        or df itself when it has n_out rows or fewer.
+
+    Raises:
+        ValueError: If x or y does not exist, or y is not numeric.
+    """
+    schema = df.schema
+    missing = [col for col in [x, y, *(group or [])] if col not in schema]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(missing)}")
+    if not schema[y].is_numeric():
+        raise ValueError(f"Column '{y}' must be numeric to downsample")
+    if df.height <= n_out:
+        return df
+    # NaN counts as missing too; drop_nulls alone would keep those rows
+    nan_as_null = [pl.col(col).fill_nan(None) for col in (x, y) if schema[col].is_float()]
+    indexed = df.with_row_index("__row").with_columns(nan_as_null).drop_nulls([x, y])
+    total = indexed.height
+    if total == 0:
+        return indexed.drop("__row")
+    parts = indexed.partition_by(group, maintain_order=True) if group else [indexed]
+    budgets = [n_out * part.height // total for part in parts]
+    # Rounding down leaves rows over; give one to each group that got none,
+    # largest first, so small groups still appear
+    spare = n_out - sum(budgets)
+    for i in sorted(range(len(parts)), key=lambda i: -parts[i].height):
+        if spare == 0:
+            break
+        if budgets[i] == 0:
+            budgets[i] = 1
+            spare -= 1
+    keep = [
+        part["__row"].gather(_sample_indices(part, x, y, budget))
+        for part, budget in zip(parts, budgets)
+    ]
+    return df[pl.concat(keep).sort().to_numpy()]
+
+
+def _sample_indices(df: pl.DataFrame, x: str, y: str, n_out: int) -> np.ndarray:
+    """Positions of the rows lttb_downsample keeps from one series."""
+    if df.height <= n_out:
+        return np.arange(df.height)
+    x_series = df[x]
+    # LTTB needs a first, a last and at least one bucket in between
+    is_sortable = x_series.dtype.is_numeric() or x_series.dtype.is_temporal()
+    if n_out < 3 or not is_sortable or not x_series.is_sorted():
+        return np.linspace(0, df.height - 1, n_out).astype(np.int64)
+    return _lttb_indices(
+        x_series.to_physical().cast(pl.Float64).to_numpy(),
+        df[y].cast(pl.Float64).to_numpy(),
+        n_out,
+    )
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    The points between the first and last are split into n_out - 2 buckets.
+    Each bucket keeps the point forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next bucket.
+    """
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # The bucket after the last one is the final point
+    next_starts = np.append(edges[1:], n - 1)
+    next_ends = np.append(edges[2:], n)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        mean_x = x[next_starts[i]:next_ends[i]].mean()
+        mean_y = y[next_starts[i]:next_ends[i]].mean()
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+    return selected
+
+
+def execute(plan: pl.LazyFrame, *, streaming: bool = True) -> pl.DataFrame:
+    """
+    Collect a lazy pipeline into a DataFrame.
+
+    With streaming, Polars runs the plan in batches so peak memory is bounded
+    by the batch and any join or sort state rather than the whole table.
+    Filters, projections, unpivots and joins stream; operations the
+    streaming engine does not support run in memory automatically.
+
+    Args:
+        plan: The LazyFrame to execute.
+        streaming: If True, use the streaming engine where Polars provides it.
+
+    Returns:
+        The materialized DataFrame.
+    """
+    if streaming and _has_streaming_engine():
+        return plan.collect(engine="streaming")
+    return plan.collect()
+
+
+@cache
+def _has_streaming_engine() -> bool:
+    """
+    Whether this Polars release accepts collect(engine="streaming").
+
+    Checked once on a trivial plan, so errors raised by real plans are never
+    mistaken for missing engine support.
+    """
+    try:
+        pl.LazyFrame({"probe": [0]}).collect(engine="streaming")
+    except (TypeError, ValueError):
+        return False
+    return True
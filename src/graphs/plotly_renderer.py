@@ -1,12 +1,34 @@
 """Plotly implementation of the GraphRenderer protocol."""
 
-import networkx as nx
-import plotly.express as px
+import random
+from collections.abc import Callable
+from functools import cache, lru_cache, partial
+from typing import TYPE_CHECKING, ClassVar
+
+import numpy as np
 import plotly.graph_objects as go
 import polars as pl
 
 from .types import ChartType, ExportFormat, FigureResult
 
+# Plotly Express (which may pull in pandas) and NetworkX are imported where they
+# are used, so exporting or embedding a figure does not pay for them.
+if TYPE_CHECKING:
+    import networkx as nx
+
+# Seed for randomized network layouts
+_LAYOUT_SEED = 42
+# Spring layouts of graphs this large use igraph when it is installed
+_IGRAPH_MIN_NODES = 2000
+# Line and scatter charts with more rows than this draw with WebGL by
+# default, the same cutoff Plotly Express uses for render_mode="auto"
+_WEBGL_MIN_ROWS = 1000
+
+# Numeric histograms with at least this many rows are binned before plotting
+_HISTOGRAM_PREBIN_ROWS = 100_000
+# Upper bound on the number of precomputed histogram bins
+_HISTOGRAM_MAX_BINS = 200
+
 
 class PlotlyRenderer:
     """
@@ -26,6 +48,7 @@ class PlotlyRenderer:
         title: str | None = None,
         color: str | None = None,
         facet_columns: list[str] | None = None,
+        use_webgl: bool | None = None,
         **kwargs: object,
     ) -> FigureResult:
         """
@@ -40,31 +63,53 @@ class PlotlyRenderer:
             color: Optional column name for color grouping.
             facet_columns: Optional list of columns for creating interactive
                 dropdown selector. Multiple columns are combined as "Val1 | Val2".
+            use_webgl: Draw line and scatter charts as Scattergl (True) or SVG
+                Scatter (False) traces. None uses WebGL above 1,000 rows.
             **kwargs: Additional Plotly-specific options.
 
         Returns:
             A Plotly Figure object.
         """
-        pandas_df = df.to_pandas()
+        # Work only with the columns the chart references, not the whole frame
+        columns = self._referenced_columns(df, x, y, color, facet_columns, kwargs)
+        df = df.select(columns)
+        if use_webgl is None:
+            use_webgl = df.height > _WEBGL_MIN_ROWS
         if facet_columns is not None and len(facet_columns) > 0:
+            # Facet traces are built from Polars columns; no pandas needed
             return self._create_faceted_chart(
-                pandas_df, chart_type, x, y, title, color, facet_columns, **kwargs
+                df, chart_type, x, y, title, color, facet_columns, use_webgl, **kwargs
             )
-        chart_builders = {
-            ChartType.BAR: self._create_bar,
-            ChartType.LINE: self._create_line,
-            ChartType.SCATTER: self._create_scatter,
-            ChartType.HISTOGRAM: self._create_histogram,
-            ChartType.PIE: self._create_pie,
-        }
-        builder = chart_builders.get(chart_type)
+        if chart_type in (ChartType.LINE, ChartType.SCATTER):
+            kwargs.setdefault("render_mode", "webgl" if use_webgl else "svg")
+        builder = self._CHART_BUILDERS.get(chart_type)
         if builder is None:
             raise ValueError(f"Unsupported chart type: {chart_type}")
-        return builder(pandas_df, x, y, title, color, **kwargs)
+        return builder(self, df, x, y, title, color, **kwargs)
+
+    def _referenced_columns(
+        self,
+        df: pl.DataFrame,
+        x: str,
+        y: str | list[str],
+        color: str | None,
+        facet_columns: list[str] | None,
+        kwargs: dict[str, object],
+    ) -> list[str]:
+        """List the columns of df named by the chart arguments, in frame order."""
+        names = {x, color, *(y if isinstance(y, list) else [y]), *(facet_columns or [])}
+        # Plotly options such as hover_name or hover_data may name columns too
+        for value in kwargs.values():
+            if isinstance(value, str):
+                names.add(value)
+            elif isinstance(value, (list, tuple, dict)):
+                # hover_data may also be a dict keyed by column name
+                names.update(item for item in value if isinstance(item, str))
+        return [column for column in df.columns if column in names]
 
     def _create_bar(
         self,
-        df: object,
+        df: pl.DataFrame,
         x: str,
         y: str | list[str],
         title: str | None,
@@ -72,11 +117,13 @@ class PlotlyRenderer:
         **kwargs: object,
     ) -> go.Figure:
         """Create a bar chart."""
-        return px.bar(df, x=x, y=y, title=title, color=color, **kwargs)
+        import plotly.express as px
+
+        return px.bar(_express_frame(df), x=x, y=y, title=title, color=color, **kwargs)
 
     def _create_line(
         self,
-        df: object,
+        df: pl.DataFrame,
         x: str,
         y: str | list[str],
         title: str | None,
@@ -84,11 +131,13 @@ class PlotlyRenderer:
         **kwargs: object,
     ) -> go.Figure:
         """Create a line chart."""
-        return px.line(df, x=x, y=y, title=title, color=color, **kwargs)
+        import plotly.express as px
+
+        return px.line(_express_frame(df), x=x, y=y, title=title, color=color, **kwargs)
 
     def _create_scatter(
         self,
-        df: object,
+        df: pl.DataFrame,
         x: str,
         y: str | list[str],
         title: str | None,
@@ -96,24 +145,85 @@ class PlotlyRenderer:
         **kwargs: object,
     ) -> go.Figure:
         """Create a scatter plot."""
+        import plotly.express as px
+
         y_col = y[0] if isinstance(y, list) else y
-        return px.scatter(df, x=x, y=y_col, title=title, color=color, **kwargs)
+        return px.scatter(_express_frame(df), x=x, y=y_col, title=title, color=color, **kwargs)
 
     def _create_histogram(
         self,
-        df: object,
+        df: pl.DataFrame,
         x: str,
         y: str | list[str],
         title: str | None,
         color: str | None,
         **kwargs: object,
     ) -> go.Figure:
-        """Create a histogram."""
-        return px.histogram(df, x=x, title=title, color=color, **kwargs)
+        """
+        Create a histogram.
+
+        Large numeric columns are binned here and drawn as bars, so the figure
+        carries bin counts instead of every raw value for plotly.js to bin.
+        """
+        import plotly.express as px
+
+        is_large_numeric = (
+            df.height >= _HISTOGRAM_PREBIN_ROWS
+            and df.schema[x].is_numeric()
+            and not kwargs
+        )
+        if is_large_numeric:
+            return self._create_binned_histogram(df, x, title, color)
+        return px.histogram(_express_frame(df), x=x, title=title, color=color, **kwargs)
+
+    def _create_binned_histogram(
+        self,
+        df: pl.DataFrame,
+        x: str,
+        title: str | None,
+        color: str | None,
+    ) -> go.Figure:
+        """Create a histogram from bin counts computed with numpy."""
+        values = df[x].cast(pl.Float64).to_numpy()
+        finite = np.isfinite(values)
+        edges = np.histogram_bin_edges(values[finite], bins="auto")
+        if len(edges) > _HISTOGRAM_MAX_BINS + 1:
+            edges = np.histogram_bin_edges(values[finite], bins=_HISTOGRAM_MAX_BINS)
+        widths = np.diff(edges)
+        centers = edges[:-1] + widths / 2
+        if color is None:
+            groups = [(x, finite)]
+        else:
+            # eq_missing matches None against nulls, so null colours get a bar too
+            labels = df[color]
+            groups = [
+                (str(value), finite & labels.eq_missing(value).to_numpy())
+                for value in labels.unique().sort(nulls_last=True).to_list()
+            ]
+        fig = go.Figure()
+        fig.add_traces([
+            go.Bar(
+                x=centers,
+                y=np.histogram(values[mask], bins=edges)[0],
+                width=widths,
+                name=name,
+                showlegend=color is not None,
+            )
+            for name, mask in groups
+        ])
+        fig.update_layout(
+            title=title,
+            barmode="relative",
+            bargap=0,
+            xaxis_title=x,
+            yaxis_title="count",
+            legend_title_text=color,
+        )
+        return fig
 
     def _create_pie(
         self,
-        df: object,
+        df: pl.DataFrame,
         x: str,
         y: str | list[str],
         title: str | None,
@@ -121,39 +231,61 @@ class PlotlyRenderer:
         **kwargs: object,
     ) -> go.Figure:
         """Create a pie chart."""
+        import plotly.express as px
+
         y_col = y[0] if isinstance(y, list) else y
-        return px.pie(df, names=x, values=y_col, title=title, **kwargs)
+        return px.pie(_express_frame(df), names=x, values=y_col, title=title, **kwargs)
+
+    # Chart builders by type, built once with the class rather than per call
+    _CHART_BUILDERS: ClassVar[dict[ChartType, Callable[..., go.Figure]]] = {
+        ChartType.BAR: _create_bar,
+        ChartType.LINE: _create_line,
+        ChartType.SCATTER: _create_scatter,
+        ChartType.HISTOGRAM: _create_histogram,
+        ChartType.PIE: _create_pie,
+    }
 
     def _create_faceted_chart(
         self,
-        df: object,
+        df: pl.DataFrame,
         chart_type: ChartType,
         x: str,
         y: str | list[str],
         title: str | None,
         color: str | None,
         facet_columns: list[str],
+        use_webgl: bool,
         **kwargs: object,
     ) -> go.Figure:
         """
         Create an interactive chart with dropdown selector for facet values.
 
-        Generates separate traces for each unique combination of facet column
-        values and adds a dropdown menu to switch between them. Multiple facet
-        columns are combined as "Val1 | Val2 | ...".
+        Draws the first facet with one trace per color group and adds a
+        dropdown menu whose buttons swap in the data of each unique
+        combination of facet column values. Multiple facet columns are
+        combined as "Val1 | Val2 | ...".
         """
-        import pandas as pd
-        pandas_df = df if isinstance(df, pd.DataFrame) else df
         facet_label = " | ".join(facet_columns)
-        if len(facet_columns) == 1:
-            pandas_df = pandas_df.copy()
-            pandas_df["_facet_combined"] = pandas_df[facet_columns[0]].astype(str)
-        else:
-            pandas_df = pandas_df.copy()
-            pandas_df["_facet_combined"] = pandas_df[facet_columns].apply(
-                lambda row: " | ".join(str(v) for v in row), axis=1
-            )
-        facet_values = sorted(pandas_df["_facet_combined"].unique().tolist())
+        # Split once instead of scanning the frame for every facet value.
+        # Partitions are keyed by the columns' own values (categorical codes,
+        # integers, nulls), so a missing value stays apart from a "None"
+        # string; only the distinct keys are stringified for the labels
+        partitions = df.partition_by(facet_columns, as_dict=True)
+        keys = list(partitions)
+        key_labels = [
+            pl.Series([key[index] for key in keys], dtype=df.schema[column])
+            .cast(pl.Utf8)
+            .fill_null("None")
+            .to_list()
+            for index, column in enumerate(facet_columns)
+        ]
+        labels = [" | ".join(parts) for parts in zip(*key_labels)]
+        # Sorted by label; a null facet comes after a "None" string
+        order = sorted(
+            range(len(keys)), key=lambda i: (labels[i], any(v is None for v in keys[i]))
+        )
+        facet_values = [labels[i] for i in order]
+        facet_frames = [partitions[keys[i]] for i in order]
         if len(facet_values) == 0:
             raise ValueError(f"No values found in facet columns '{facet_label}'")
         fig = go.Figure()
@@ -162,27 +294,43 @@ class PlotlyRenderer:
         # Handle pie charts differently - create a single pie chart that gets updated
         if chart_type == ChartType.PIE:
             # Start with the first facet
-            first_facet_df = pandas_df[pandas_df["_facet_combined"] == facet_values[0]]
+            first_facet_df = facet_frames[0]
             fig.add_trace(go.Pie(
-                labels=first_facet_df[x].tolist(),
-                values=first_facet_df[y_col].tolist(),
+                labels=first_facet_df[x].to_numpy(),
+                values=first_facet_df[y_col].to_numpy(),
                 name=str(facet_values[0]),
             ))
         else:
-            # For other chart types, create multiple traces with visibility toggle
-            for idx, facet_value in enumerate(facet_values):
-                facet_df = pandas_df[pandas_df["_facet_combined"] == facet_value]
-                is_visible = idx == 0
-                self._add_facet_traces(
-                    fig, facet_df, chart_type, x, y_col, color, facet_value, is_visible
+            # One trace per color group showing the first facet; the dropdown
+            # swaps the traces' data rather than toggling per-facet traces
+            has_groups = color is not None and color in df.columns
+            # Sorted by Polars, which also places a null group (named "None") last
+            group_values = (
+                df[color].unique().sort(nulls_last=True).to_list() if has_groups else [None]
+            )
+            facet_data = [
+                self._facet_trace_data(
+                    facet_frame, chart_type, x, y_col,
+                    color if has_groups else None, group_values,
+                )
+                for facet_frame in facet_frames
+            ]
+            # Added in one call so the figure is validated once, not per trace
+            fig.add_traces([
+                self._build_single_trace(
+                    chart_type, trace_data,
+                    name=str(group_value if has_groups else facet_values[0]),
+                    use_webgl=use_webgl,
                 )
+                for group_value, trace_data in zip(group_values, facet_data[0])
+            ])
         if chart_type == ChartType.PIE:
             dropdown_buttons = self._create_pie_dropdown_buttons(
-                pandas_df, facet_values, facet_label, x, y_col
+                facet_frames, facet_values, facet_label, x, y_col
             )
         else:
             dropdown_buttons = self._create_dropdown_buttons(
-                pandas_df, facet_values, facet_label, chart_type, color
+                facet_values, facet_label, facet_data, has_groups
             )
         chart_title = title or f"Chart by {facet_label}"
         fig.update_layout(
@@ -200,121 +348,81 @@ class PlotlyRenderer:
         )
         return fig
 
-    def _add_facet_traces(
+    def _facet_trace_data(
         self,
-        fig: go.Figure,
-        df: object,
+        df: pl.DataFrame,
         chart_type: ChartType,
         x: str,
         y: str,
         color: str | None,
-        facet_value: str,
-        is_visible: bool,
-    ) -> None:
-        """Add traces for a single facet value to the figure."""
-        import pandas as pd
-        pandas_df = df if isinstance(df, pd.DataFrame) else df
-        if color is not None and color in pandas_df.columns:
-            color_values = sorted(pandas_df[color].unique().tolist())
-            for color_val in color_values:
-                color_df = pandas_df[pandas_df[color] == color_val]
-                self._add_single_trace(
-                    fig, color_df, chart_type, x, y, is_visible,
-                    name=str(color_val), facet_value=facet_value
-                )
+        group_values: list[object],
+    ) -> list[dict[str, np.ndarray]]:
+        """
+        Collect one facet's trace arrays for each color group.
+
+        Without a color column the whole facet is one group (group_values is
+        [None]). Groups missing from the facet get empty arrays so every facet
+        has the same number of entries, in group_values order.
+        """
+        axes = {"x": x} if chart_type == ChartType.HISTOGRAM else {"x": x, "y": y}
+        if color is None:
+            frames = {None: df}
         else:
-            self._add_single_trace(
-                fig, pandas_df, chart_type, x, y, is_visible,
-                name=str(facet_value), facet_value=facet_value
-            )
+            frames = {
+                key[0]: frame
+                for key, frame in df.partition_by(color, as_dict=True).items()
+            }
+        trace_data = []
+        for group_value in group_values:
+            frame = frames.get(group_value)
+            trace_data.append({
+                axis: np.empty(0) if frame is None else frame[column].to_numpy()
+                for axis, column in axes.items()
+            })
+        return trace_data
 
-    def _add_single_trace(
+    def _build_single_trace(
         self,
-        fig: go.Figure,
-        df: object,
         chart_type: ChartType,
-        x: str,
-        y: str,
-        is_visible: bool,
+        trace_data: dict[str, np.ndarray],
         name: str,
-        facet_value: str,
-    ) -> None:
-        """Add a single trace to the figure based on chart type."""
-        import pandas as pd
-        pandas_df = df if isinstance(df, pd.DataFrame) else df
-        trace_meta = {"facet_value": facet_value}
+        use_webgl: bool = False,
+    ) -> go.Bar | go.Scatter | go.Scattergl | go.Histogram:
+        """Build a single trace based on chart type."""
+        scatter = go.Scattergl if use_webgl else go.Scatter
         if chart_type == ChartType.BAR:
-            fig.add_trace(go.Bar(
-                x=pandas_df[x].tolist(),
-                y=pandas_df[y].tolist(),
-                name=name,
-                visible=is_visible,
-                meta=trace_meta,
-            ))
-        elif chart_type == ChartType.LINE:
-            fig.add_trace(go.Scatter(
-                x=pandas_df[x].tolist(),
-                y=pandas_df[y].tolist(),
-                mode="lines+markers",
-                name=name,
-                visible=is_visible,
-                meta=trace_meta,
-            ))
-        elif chart_type == ChartType.SCATTER:
-            fig.add_trace(go.Scatter(
-                x=pandas_df[x].tolist(),
-                y=pandas_df[y].tolist(),
-                mode="markers",
-                name=name,
-                visible=is_visible,
-                meta=trace_meta,
-            ))
-        elif chart_type == ChartType.HISTOGRAM:
-            fig.add_trace(go.Histogram(
-                x=pandas_df[x].tolist(),
-                name=name,
-                visible=is_visible,
-                meta=trace_meta,
-            ))
-        elif chart_type == ChartType.PIE:
-            fig.add_trace(go.Pie(
-                labels=pandas_df[x].tolist(),
-                values=pandas_df[y].tolist(),
-                name=name,
-                visible=is_visible,
-                meta=trace_meta,
-            ))
+            return go.Bar(**trace_data, name=name)
+        if chart_type == ChartType.LINE:
+            return scatter(**trace_data, mode="lines+markers", name=name)
+        if chart_type == ChartType.SCATTER:
+            return scatter(**trace_data, mode="markers", name=name)
+        if chart_type == ChartType.HISTOGRAM:
+            return go.Histogram(**trace_data, name=name)
+        raise ValueError(f"Unsupported chart type for facets: {chart_type}")
 
     def _create_dropdown_buttons(
         self,
-        df: object,
         facet_values: list[str],
         facet_column: str,
-        chart_type: ChartType,
-        color: str | None,
+        facet_data: list[list[dict[str, np.ndarray]]],
+        has_groups: bool,
     ) -> list[dict]:
-        """Create dropdown button definitions for facet selector."""
-        import pandas as pd
-        pandas_df = df if isinstance(df, pd.DataFrame) else df
+        """
+        Create dropdown button definitions for facet selector.
+
+        Each button restyles every trace with that facet's arrays. Without
+        color groups the single trace is also renamed after the facet.
+        """
         buttons = []
-        has_color = color is not None and color in pandas_df.columns
-        if has_color:
-            num_color_values = len(pandas_df[color].unique())
-        else:
-            num_color_values = 1
-        traces_per_facet = num_color_values
-        total_traces = len(facet_values) * traces_per_facet
-        for idx, facet_value in enumerate(facet_values):
-            visibility = [False] * total_traces
-            start_idx = idx * traces_per_facet
-            end_idx = start_idx + traces_per_facet
-            for i in range(start_idx, end_idx):
-                visibility[i] = True
+        for facet_value, trace_data in zip(facet_values, facet_data):
+            restyle = {axis: [data[axis] for data in trace_data] for axis in trace_data[0]}
+            if not has_groups:
+                restyle["name"] = [str(facet_value)]
             buttons.append({
                 "label": str(facet_value),
                 "method": "update",
                 "args": [
-                    {"visible": visibility},
+                    restyle,
                     {"title": f"Chart by {facet_column}: {facet_value}"}
                 ],
             })
@@ -322,25 +430,22 @@ class PlotlyRenderer:
 
     def _create_pie_dropdown_buttons(
         self,
-        df: object,
+        facet_frames: list[pl.DataFrame],
         facet_values: list[str],
         facet_label: str,
         x: str,
         y: str,
     ) -> list[dict]:
         """Create dropdown button definitions for pie chart facet selector."""
-        import pandas as pd
-        pandas_df = df if isinstance(df, pd.DataFrame) else df
         buttons = []
-        for facet_value in facet_values:
-            facet_df = pandas_df[pandas_df["_facet_combined"] == facet_value]
+        for facet_value, facet_df in zip(facet_values, facet_frames):
             buttons.append({
                 "label": str(facet_value),
                 "method": "update",
                 "args": [
                     {
-                        "labels": [facet_df[x].tolist()],
-                        "values": [facet_df[y].tolist()],
+                        "labels": [facet_df[x].to_numpy()],
+                        "values": [facet_df[y].to_numpy()],
                         "name": [str(facet_value)],
                     },
                     {"title": f"Chart by {facet_label}: {facet_value}"}
@@ -368,7 +473,9 @@ class PlotlyRenderer:
             target: Column name for target nodes.
             weight: Optional column name for edge weights.
             title: Optional chart title.
-            layout: Layout algorithm (spring, circular, kamada_kawai, shell, random).
+            layout: Layout algorithm (spring, circular, kamada_kawai, shell, random,
+                spectral). spectral is far faster than kamada_kawai on graphs
+                of more than about a thousand nodes.
             **kwargs: Additional options.
 
         Returns:
@@ -384,60 +491,65 @@ class PlotlyRenderer:
         source: str,
         target: str,
         weight: str | None,
-    ) -> nx.Graph:
+    ) -> "nx.Graph":
         """Build a NetworkX graph from edge list DataFrame."""
+        import networkx as nx
+
         graph = nx.Graph()
-        for row in df.iter_rows(named=True):
-            edge_data = {}
-            if weight and weight in row:
-                edge_data["weight"] = row[weight]
-            graph.add_edge(row[source], row[target], **edge_data)
+        sources = df[source].to_list()
+        targets = df[target].to_list()
+        if weight and weight in df.columns:
+            graph.add_weighted_edges_from(zip(sources, targets, df[weight].to_list()))
+        else:
+            graph.add_edges_from(zip(sources, targets))
         return graph
 
     def _calculate_layout(
         self,
-        graph: nx.Graph,
+        graph: "nx.Graph",
         layout: str,
     ) -> dict[str, tuple[float, float]]:
-        """Calculate node positions using specified layout algorithm."""
-        layout_functions = {
-            "spring": nx.spring_layout,
-            "circular": nx.circular_layout,
-            "kamada_kawai": nx.kamada_kawai_layout,
-            "shell": nx.shell_layout,
-            "random": nx.random_layout,
-        }
-        layout_func = layout_functions.get(layout, nx.spring_layout)
-        return layout_func(graph)
+        """
+        Calculate node positions using specified layout algorithm.
+
+        Results are memoized on the graph's nodes and weighted edges, so
+        re-rendering an unchanged graph skips the layout solver.
+        """
+        nodes = tuple(graph.nodes())
+        edges = tuple(graph.edges(data="weight"))
+        return dict(_compute_layout(layout, nodes, edges))
 
     def _render_network_figure(
         self,
-        graph: nx.Graph,
+        graph: "nx.Graph",
         positions: dict[str, tuple[float, float]],
         title: str | None,
     ) -> go.Figure:
         """Render NetworkX graph as a Plotly figure."""
-        edge_x: list[float | None] = []
-        edge_y: list[float | None] = []
-        for edge in graph.edges():
-            x0, y0 = positions[edge[0]]
-            x1, y1 = positions[edge[1]]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        node_xy = np.array([positions[node] for node in nodes], dtype=float).reshape(-1, 2)
+        edge_index = np.array(
+            [(node_index[u], node_index[v]) for u, v in graph.edges()], dtype=np.intp
+        ).reshape(-1, 2)
+        # Each edge is drawn as start, end, NaN; the NaN breaks the line
+        edge_xy = np.full((len(edge_index), 3, 2), np.nan)
+        edge_xy[:, 0] = node_xy[edge_index[:, 0]]
+        edge_xy[:, 1] = node_xy[edge_index[:, 1]]
+        edge_xy = edge_xy.reshape(-1, 2)
         edge_trace = go.Scatter(
-            x=edge_x,
-            y=edge_y,
+            x=edge_xy[:, 0],
+            y=edge_xy[:, 1],
             line={"width": 1, "color": "#888"},
             hoverinfo="none",
             mode="lines",
         )
-        node_x = [positions[node][0] for node in graph.nodes()]
-        node_y = [positions[node][1] for node in graph.nodes()]
-        node_degrees = [graph.degree(node) for node in graph.nodes()]
-        node_labels = [str(node) for node in graph.nodes()]
+        # Each edge adds one to both endpoints (a self-loop counts twice)
+        node_degrees = np.bincount(edge_index.ravel(), minlength=len(nodes))
+        node_labels = [str(node) for node in nodes]
         node_trace = go.Scatter(
-            x=node_x,
-            y=node_y,
+            x=node_xy[:, 0],
+            y=node_xy[:, 1],
             mode="markers+text",
             hoverinfo="text",
             text=node_labels,
@@ -467,6 +579,25 @@ class PlotlyRenderer:
         )
         return fig
 
+    def with_title(self, figure: go.Figure, title: str) -> go.Figure:
+        """
+        Return a copy of figure with a different title.
+
+        Copying the traces is much cheaper than rebuilding them from the
+        data (Plotly Express groups and splits it again; networks rebuild
+        their graph).
+
+        Args:
+            figure: The Plotly Figure object to copy.
+            title: The new chart title.
+
+        Returns:
+            A new Figure with the same traces and layout apart from the title.
+        """
+        retitled = go.Figure(figure)
+        retitled.update_layout(title_text=title)
+        return retitled
+
     def export(
         self,
         figure: FigureResult,
@@ -483,24 +614,140 @@ class PlotlyRenderer:
         """
         if export_format == ExportFormat.HTML:
             figure.write_html(filepath)
-        elif export_format == ExportFormat.PNG:
-            figure.write_image(filepath, format="png")
-        elif export_format == ExportFormat.PDF:
-            figure.write_image(filepath, format="pdf")
-        elif export_format == ExportFormat.SVG:
-            figure.write_image(filepath, format="svg")
-        else:
+            return
+        image_formats = {
+            ExportFormat.PNG: "png",
+            ExportFormat.PDF: "pdf",
+            ExportFormat.SVG: "svg",
+        }
+        image_format = image_formats.get(export_format)
+        if image_format is None:
             raise ValueError(f"Unsupported export format: {export_format}")
+        _configure_kaleido()
+        figure.write_image(filepath, format=image_format)
 
-    def to_html(self, figure: FigureResult) -> str:
+    def to_html(self, figure: FigureResult, *, plotlyjs: str | bool = "cdn") -> str:
         """
         Convert Plotly figure to HTML string.
 
+        By default the plotly.js bundle is loaded from the CDN rather than
+        inlined. For offline pages with several charts, pass plotlyjs=True
+        for the first chart and plotlyjs=False for the rest so the ~3MB
+        bundle is embedded once.
+
         Args:
             figure: The Plotly Figure object.
+            plotlyjs: Passed to Plotly as include_plotlyjs ("cdn", True or
+                False).
 
         Returns:
             HTML string with embedded interactive chart.
         """
-        return figure.to_html(include_plotlyjs=True, full_html=False)
+        return figure.to_html(include_plotlyjs=plotlyjs, full_html=False)
+
 
+def _express_frame(df: pl.DataFrame) -> object:
+    """
+    Return df in a form Plotly Express can read.
+
+    Plotly 6 reads Polars frames natively through narwhals, so no copy is
+    made. Older versions get a pandas conversion.
+    """
+    if _plotly_reads_polars():
+        return df
+    return df.to_pandas()
+
+
+@cache
+def _plotly_reads_polars() -> bool:
+    """Whether the installed Plotly accepts Polars frames in Plotly Express."""
+    import plotly
+
+    return int(plotly.__version__.split(".")[0]) >= 6
+
+
+@cache
+def _configure_kaleido() -> None:
+    """
+    Configure the shared Kaleido scope once, before its first export.
+
+    With Kaleido 0.2, Plotly keeps one Kaleido process per interpreter for
+    all image exports. Charts carry no LaTeX, so MathJax is disabled to skip
+    loading it at startup (and its loading banner in PDFs). Changing the
+    setting restarts the process, hence doing it before the first export.
+    Plotly releases built for Kaleido 1.x have no shared scope and are left
+    on their defaults.
+    """
+    import plotly.io as pio
+
+    scope = getattr(pio.kaleido, "scope", None)
+    if scope is not None:
+        scope.mathjax = None
+
+
+@lru_cache(maxsize=32)
+def _compute_layout(
+    layout: str,
+    nodes: tuple[object, ...],
+    edges: tuple[tuple[object, object, object], ...],
+) -> dict[object, tuple[float, float]]:
+    """Rebuild the graph from its nodes and weighted edges and lay it out."""
+    import networkx as nx
+
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(
+        (u, v) if weight is None else (u, v, {"weight": weight})
+        for u, v, weight in edges
+    )
+    # Randomized layouts are seeded so a cached result matches a fresh one
+    layout_functions = {
+        "spring": partial(nx.spring_layout, seed=_LAYOUT_SEED),
+        "circular": nx.circular_layout,
+        "kamada_kawai": nx.kamada_kawai_layout,
+        "shell": nx.shell_layout,
+        "random": partial(nx.random_layout, seed=_LAYOUT_SEED),
+        # Laplacian eigenvectors; NetworkX uses a scipy sparse solver from 500 nodes
+        "spectral": nx.spectral_layout,
+    }
+    if layout not in layout_functions:
+        layout = "spring"
+    if layout == "spring" and len(nodes) >= _IGRAPH_MIN_NODES:
+        positions = _igraph_spring_layout(nodes, edges)
+        if positions is not None:
+            return positions
+    return layout_functions[layout](graph)
+
+
+def _igraph_spring_layout(
+    nodes: tuple[object, ...],
+    edges: tuple[tuple[object, object, object], ...],
+) -> dict[object, np.ndarray] | None:
+    """
+    Fruchterman-Reingold layout computed by igraph's C implementation.
+
+    Returns None when python-igraph is not installed. Positions are rescaled
+    to [-1, 1] like NetworkX layouts. igraph draws from a seeded generator
+    during the call, then goes back to its default (the random module), so
+    results are reproducible.
+    """
+    try:
+        import igraph
+    except ImportError:
+        return None
+    import networkx as nx
+
+    node_index = {node: i for i, node in enumerate(nodes)}
+    ig_graph = igraph.Graph(
+        n=len(nodes), edges=[(node_index[u], node_index[v]) for u, v, _ in edges]
+    )
+    weights = None
+    if any(weight is not None for _, _, weight in edges):
+        weights = [1 if weight is None else weight for _, _, weight in edges]
+    igraph.set_random_number_generator(random.Random(_LAYOUT_SEED))
+    try:
+        layout = ig_graph.layout_fruchterman_reingold(weights=weights)
+    finally:
+        igraph.set_random_number_generator(random)
+    coords = nx.rescale_layout(np.asarray(layout.coords, dtype=float))
+    return dict(zip(nodes, coords))
@@ -25,6 +25,7 @@ class GraphRenderer(Protocol):
         title: str | None = None,
         color: str | None = None,
         facet_columns: list[str] | None = None,
+        use_webgl: bool | None = None,
         **kwargs: object,
     ) -> FigureResult:
         """
@@ -40,6 +41,8 @@ class GraphRenderer(Protocol):
             facet_columns: Optional list of columns for creating interactive
                 dropdown selector. When provided, generates a chart with a
                 dropdown menu. Multiple columns are combined as "Val1 | Val2".
+            use_webgl: Draw line and scatter charts with GPU (WebGL) rendering
+                (True) or as SVG (False). None lets the renderer decide by size.
             **kwargs: Additional renderer-specific options.
 
         Returns:
@@ -67,7 +70,7 @@ class GraphRenderer(Protocol):
             target: Column name for target nodes.
             weight: Optional column name for edge weights.
             title: Optional chart title.
-            layout: Graph layout algorithm (spring, circular, kamada_kawai, etc.).
+            layout: Graph layout algorithm (spring, circular, kamada_kawai, spectral, etc.).
             **kwargs: Additional renderer-specific options.
 
         Returns:
@@ -75,6 +78,22 @@ class GraphRenderer(Protocol):
         """
         ...
 
+    def with_title(self, figure: FigureResult, title: str) -> FigureResult:
+        """
+        Return a copy of figure with a different title.
+
+        Cheaper than building the chart again when only the title changes.
+        The original figure is left untouched.
+
+        Args:
+            figure: The figure object to copy.
+            title: The new chart title.
+
+        Returns:
+            A new figure object with the same data and the given title.
+        """
+        ...
+
     def export(
         self,
         figure: FigureResult,
@@ -91,12 +110,15 @@ class GraphRenderer(Protocol):
         """
         ...
 
-    def to_html(self, figure: FigureResult) -> str:
+    def to_html(self, figure: FigureResult, *, plotlyjs: str | bool = "cdn") -> str:
         """
         Convert figure to HTML string for embedding.
 
         Args:
             figure: The figure object to convert.
+            plotlyjs: How the charting library's script is included: "cdn"
+                to load it from a CDN, True to inline it, or False to omit it
+                (for pages that already include it once).
 
         Returns:
             HTML string representation of the figure.
@@ -1,10 +1,410 @@
 """Web GUI using Streamlit."""
 
+import hashlib
+import weakref
+from typing import BinaryIO
+
+import polars as pl
 import streamlit as st
 
-from src.engine import apply_lookup, compare_datasets, drop_columns, exclude_values, filter_data, load_data, unpivot_data
+from src.engine import (
+    apply_lookup,
+    compare_datasets,
+    drop_columns,
+    exclude_values,
+    execute,
+    filter_data,
+    load_data,
+    lttb_downsample,
+    unpivot_data,
+)
 from src.graphs import ChartType, get_renderer, list_renderers
 
+
+@st.cache_resource(show_spinner=False)
+def _frame_digests() -> dict[int, tuple[list[str], list[str], bytes]]:
+    """Digests by frame id, shared across reruns (script globals are not)."""
+    return {}
+
+
+def _frame_digest(df: pl.DataFrame) -> tuple[list[str], list[str], bytes]:
+    """
+    Fingerprint a DataFrame for Streamlit's cache by schema and row hashes.
+
+    The row hashes are digested in order, so frames holding the same rows in
+    a different order (which plot differently) get different fingerprints.
+
+    The app never modifies a frame in place, so each frame is hashed once
+    and its digest reused on later reruns until the frame is collected.
+    """
+    digests = _frame_digests()
+    key = id(df)
+    digest = digests.get(key)
+    if digest is None:
+        row_hash = hashlib.blake2b(df.hash_rows().to_numpy()).digest() if df.width else b""
+        digest = (df.columns, [str(dtype) for dtype in df.dtypes], row_hash)
+        # Drop the entry when the frame is collected, before its id is reused
+        weakref.finalize(df, digests.pop, key, None)
+        digests[key] = digest
+    return digest
+
+
+# Streamlit reruns the whole script on every widget change; these caches let
+# reruns with unchanged inputs reuse parsed and transformed frames. Polars
+# frames are immutable, so cache_resource hands back the cached object itself
+# (cache_data would pickle it, which costs about as much as parsing).
+_FRAME_HASH_FUNCS = {pl.DataFrame: _frame_digest}
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _load_upload(file_id: str, _upload: BinaryIO) -> pl.DataFrame:
+    """
+    Parse an uploaded file once per upload.
+
+    Args:
+        file_id: Streamlit's unique id for the upload, used as the cache key.
+        _upload: The uploaded file (not hashed; named with a leading underscore).
+
+    Returns:
+        The parsed DataFrame.
+    """
+    return load_data(_upload)
+
+
+def _preview(df: pl.DataFrame, rows: int = 10) -> pl.DataFrame:
+    """First rows of df for st.dataframe, which reads Polars frames via Arrow."""
+    return df.head(rows)
+
+
+def _pipeline(source: pl.DataFrame) -> pl.LazyFrame:
+    """
+    The Visualize tab's transform plan, restarted when its source changes.
+
+    Lookup, filter, exclude and drop steps extend one LazyFrame in
+    st.session_state["pipeline"] instead of each keeping a materialized copy
+    of the data. A new upload or unpivot setting starts a fresh plan.
+
+    Args:
+        source: The uploaded (and possibly unpivoted) frame the steps apply to.
+
+    Returns:
+        The current plan, rooted at source.
+    """
+    current = st.session_state.get("pipeline_source")
+    if current is not source and (current is None or _frame_digest(current) != _frame_digest(source)):
+        _reset_pipeline(source)
+    return st.session_state["pipeline"]
+
+
+def _reset_pipeline(source: pl.DataFrame) -> None:
+    """Start an empty plan on source and forget the lookups applied so far."""
+    plan = source.lazy()
+    st.session_state["pipeline_source"] = source
+    st.session_state["pipeline"] = plan
+    st.session_state["pipeline_frame"] = (plan, source)
+    st.session_state.pop("lookup_mappings", None)
+    st.session_state.pop("lookup_mappings_reverse", None)
+
+
+def _collect_pipeline(plan: pl.LazyFrame) -> pl.DataFrame:
+    """
+    Collect plan, reusing the last result while the plan is unchanged.
+
+    Only the latest result is kept, so the session holds the source and one
+    transformed frame however many steps have been applied.
+    """
+    cached_plan, frame = st.session_state.get("pipeline_frame", (None, None))
+    if cached_plan is not plan:
+        frame = execute(plan)
+        st.session_state["pipeline_frame"] = (plan, frame)
+    return frame
+
+
+@st.cache_resource(show_spinner=False, max_entries=32, hash_funcs=_FRAME_HASH_FUNCS)
+def _unique_strings(df: pl.DataFrame, column: str) -> list[str]:
+    """
+    Distinct values of a column as strings, for multiselect options.
+
+    Values are cast by Polars, so they read the same as the text that
+    filter_data and exclude_values compare non-numeric columns against.
+    Nulls are shown as "None".
+    """
+    return df[column].unique().cast(pl.Utf8).fill_null("None").to_list()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS)
+def _create_chart(renderer_name: str, df: pl.DataFrame, **options: object) -> object:
+    """Build a chart with the named renderer; identical requests reuse the figure."""
+    return get_renderer(renderer_name).create_chart(df=df, **options)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS)
+def _chart_html(renderer_name: str, retitle: str, df: pl.DataFrame, **options: object) -> str:
+    """
+    Download HTML for the _create_chart figure with the same arguments.
+
+    Cached under the figure's key plus the title it is given afterwards
+    (retitle, empty for none), so repeated Generate clicks with unchanged
+    inputs skip serializing the figure again.
+    """
+    renderer = get_renderer(renderer_name)
+    fig = _create_chart(renderer_name, df=df, **options)
+    return renderer.to_html(renderer.with_title(fig, retitle) if retitle else fig)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS)
+def _create_network(renderer_name: str, df: pl.DataFrame, **options: object) -> object:
+    """Build a network graph with the named renderer; identical requests reuse the figure."""
+    return get_renderer(renderer_name).create_network(df=df, **options)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS)
+def _network_html(renderer_name: str, retitle: str, df: pl.DataFrame, **options: object) -> str:
+    """Download HTML for the _create_network graph, cached like _chart_html."""
+    renderer = get_renderer(renderer_name)
+    fig = _create_network(renderer_name, df=df, **options)
+    return renderer.to_html(renderer.with_title(fig, retitle) if retitle else fig)
+
+
+_compare_datasets = st.cache_resource(
+    show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS
+)(compare_datasets)
+_unpivot_data = st.cache_resource(
+    show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS
+)(unpivot_data)
+_lttb_downsample = st.cache_resource(
+    show_spinner=False, max_entries=8, hash_funcs=_FRAME_HASH_FUNCS
+)(lttb_downsample)
+
+# Line and scatter charts with more rows are downsampled to this many points
+_CHART_MAX_POINTS = 3000
+# kamada_kawai is cubic in the node count; larger graphs fall back to spectral
+_KAMADA_KAWAI_MAX_NODES = 2000
+
+
+@st.fragment
+def _lookup_section(df: pl.DataFrame) -> None:
+    """Lookup expander: replace codes in a column with labels from a second file."""
+    current_columns = df.columns
+    with st.expander("📋 Lookup Mapping (replace codes with labels)", expanded=False):
+        lookup_file = st.file_uploader(
+            "Upload Lookup File",
+            type=["csv", "json"],
+            key="lookup_file",
+            help="CSV/JSON file containing code-to-label mappings",
+        )
+        if lookup_file:
+            try:
+                lookup_df = _load_upload(lookup_file.file_id, lookup_file)
+                lookup_columns = lookup_df.columns
+                st.dataframe(_preview(lookup_df, 5), use_container_width=True)
+                lookup_col1, lookup_col2, lookup_col3 = st.columns(3)
+                with lookup_col1:
+                    lookup_source_column = st.selectbox(
+                        "Column to Replace",
+                        options=current_columns,
+                        index=0,
+                        help="Column in main data containing codes to replace",
+                        key="lookup_source",
+                    )
+                with lookup_col2:
+                    lookup_code_column = st.selectbox(
+                        "Code Column (lookup)",
+                        options=lookup_columns,
+                        index=0,
+                        help="Column in lookup file containing codes",
+                        key="lookup_code",
+                    )
+                with lookup_col3:
+                    default_label_idx = 1 if len(lookup_columns) > 1 else 0
+                    lookup_label_column = st.selectbox(
+                        "Label Column (lookup)",
+                        options=lookup_columns,
+                        index=default_label_idx,
+                        help="Column in lookup file containing labels",
+                        key="lookup_label",
+                    )
+                if st.button("Apply Lookup", key="apply_lookup"):
+                    try:
+                        plan = apply_lookup(
+                            df=st.session_state["pipeline"],
+                            lookup_df=lookup_df.lazy(),
+                            source_column=lookup_source_column,
+                            code_column=lookup_code_column,
+                            label_column=lookup_label_column,
+                        )
+                        # Store the lookup mapping for filter display
+                        lookup_mapping = dict(zip(
+                            lookup_df[lookup_code_column].to_list(),
+                            lookup_df[lookup_label_column].to_list()
+                        ))
+                        if "lookup_mappings" not in st.session_state:
+                            st.session_state["lookup_mappings"] = {}
+                        st.session_state["lookup_mappings"][lookup_source_column] = lookup_mapping
+                        # Label-to-code mapping, built once here rather than on every rerun
+                        st.session_state.setdefault("lookup_mappings_reverse", {})[lookup_source_column] = {
+                            label: code for code, label in lookup_mapping.items()
+                        }
+
+                        _collect_pipeline(plan)
+                        st.session_state["pipeline"] = plan
+                        st.session_state["lookup_message"] = "Lookup applied successfully!"
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error applying lookup: {e}")
+            except Exception as e:
+                st.error(f"Error loading lookup file: {e}")
+        message = st.session_state.pop("lookup_message", None)
+        if message:
+            st.success(message)
+            st.dataframe(_preview(df), use_container_width=True)
+
+
+@st.fragment
+def _filter_section(df: pl.DataFrame, reverse_mappings: dict[str, dict]) -> None:
+    """Filter expander: keep only rows with the selected values."""
+    current_columns = df.columns
+    with st.expander("🔍 Filter Data (keep values)", expanded=False):
+        if st.checkbox(
+            "Enable filter",
+            value=False,
+            key="filter_enable",
+            help="Show the column and value pickers; values are only loaded while this is on",
+        ):
+            filter_column = st.selectbox(
+                "Filter Column",
+                options=current_columns,
+                index=0,
+                key="filter_column",
+                help="Select column to filter on",
+            )
+            unique_values_str = _unique_strings(df, filter_column)
+
+            # Check if this column has a lookup mapping
+            if filter_column in reverse_mappings:
+                # Create display options showing both code and label
+                reverse_mapping = reverse_mappings[filter_column]
+                display_options = []
+                for value in unique_values_str:
+                    original_code = reverse_mapping.get(value, value)
+                    display_options.append(f"{original_code} - {value}")
+                filter_display_options = display_options
+                # Create mapping from display option back to actual value
+                display_to_value = dict(zip(display_options, unique_values_str))
+            else:
+                filter_display_options = unique_values_str
+                display_to_value = dict(zip(unique_values_str, unique_values_str))
+
+            filter_values = st.multiselect(
+                "Values to Keep",
+                options=filter_display_options,
+                default=[],
+                help="Select values to keep (leave empty to keep all). Shows 'Code - Label' for lookup columns.",
+                key="filter_values",
+            )
+            # Convert display options back to actual values for filtering
+            actual_filter_values = [display_to_value[opt] for opt in filter_values]
+            if st.button("Apply Filter", key="apply_filter") and actual_filter_values:
+                try:
+                    plan = filter_data(df=st.session_state["pipeline"], column=filter_column, values=actual_filter_values)
+                    result = _collect_pipeline(plan)
+                    st.session_state["pipeline"] = plan
+                    st.session_state["filter_message"] = f"Filtered to {len(result)} rows"
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error filtering data: {e}")
+        message = st.session_state.pop("filter_message", None)
+        if message:
+            st.success(message)
+            st.dataframe(_preview(df), use_container_width=True)
+
+
+@st.fragment
+def _exclude_section(df: pl.DataFrame, reverse_mappings: dict[str, dict]) -> None:
+    """Exclude expander: remove rows with the selected values."""
+    current_columns = df.columns
+    with st.expander("🚫 Exclude Row Values", expanded=False):
+        if st.checkbox(
+            "Enable exclusion",
+            value=False,
+            key="exclude_enable",
+            help="Show the column and value pickers; values are only loaded while this is on",
+        ):
+            exclude_column = st.selectbox(
+                "Exclude Column",
+                options=current_columns,
+                index=0,
+                key="exclude_column",
+                help="Select column to exclude values from",
+            )
+            exclude_unique_values_str = _unique_strings(df, exclude_column)
+
+            # Check if this column has a lookup mapping
+            if exclude_column in reverse_mappings:
+                # Create display options showing both code and label
+                reverse_mapping = reverse_mappings[exclude_column]
+                exclude_display_options = []
+                for value in exclude_unique_values_str:
+                    original_code = reverse_mapping.get(value, value)
+                    exclude_display_options.append(f"{original_code} - {value}")
+                exclude_display_to_value = dict(zip(exclude_display_options, exclude_unique_values_str))
+            else:
+                exclude_display_options = exclude_unique_values_str
+                exclude_display_to_value = dict(zip(exclude_unique_values_str, exclude_unique_values_str))
+
+            exclude_values_selected = st.multiselect(
+                "Values to Exclude",
+                options=exclude_display_options,
+                default=[],
+                help="Select row values to remove (e.g., 'Total', 'Unknown'). Shows 'Code - Label' for lookup columns.",
+                key="exclude_values",
+            )
+            # Convert display options back to actual values for exclusion
+            actual_exclude_values = [exclude_display_to_value[opt] for opt in exclude_values_selected]
+            if st.button("Apply Exclusion", key="apply_exclude") and actual_exclude_values:
+                try:
+                    plan = exclude_values(
+                        df=st.session_state["pipeline"], column=exclude_column, values=actual_exclude_values
+                    )
+                    result = _collect_pipeline(plan)
+                    st.session_state["pipeline"] = plan
+                    st.session_state["exclude_message"] = f"Excluded values, {len(result)} rows remaining"
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error excluding values: {e}")
+        message = st.session_state.pop("exclude_message", None)
+        if message:
+            st.success(message)
+            st.dataframe(_preview(df), use_container_width=True)
+
+
+@st.fragment
+def _drop_section(df: pl.DataFrame) -> None:
+    """Drop expander: remove the selected columns."""
+    current_columns = df.columns
+    with st.expander("🗑️ Drop Columns (ignore columns)", expanded=False):
+        columns_to_drop = st.multiselect(
+            "Columns to Drop",
+            options=current_columns,
+            default=[],
+            help="Select columns to ignore/remove from the data (e.g., 'Total', 'Subtotal')",
+            key="drop_columns",
+        )
+        if st.button("Drop Columns", key="apply_drop") and columns_to_drop:
+            try:
+                plan = drop_columns(df=st.session_state["pipeline"], columns=columns_to_drop)
+                _collect_pipeline(plan)
+                st.session_state["pipeline"] = plan
+                st.session_state["drop_message"] = f"Dropped {len(columns_to_drop)} column(s)"
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error dropping columns: {e}")
+        message = st.session_state.pop("drop_message", None)
+        if message:
+            st.success(message)
+            st.dataframe(_preview(df), use_container_width=True)
+
+
 st.set_page_config(layout="wide", page_title="Data Viz Tool")
 
 st.title("📊 Data Visualization Tool")
@@ -36,25 +436,33 @@ with tab_compare:
         file_b = st.file_uploader(
             "Upload Dataset B", type=["csv", "json"], key="compare_b"
         )
-    join_key = st.text_input("Join Key Column Name", value="id")
+    key_col, how_col = st.columns(2)
+    with key_col:
+        join_key = st.text_input("Join Key Column Name", value="id")
+    with how_col:
+        join_how = st.selectbox(
+            "Join Type",
+            options=["full", "left"],
+            index=0,
+            help="full keeps rows from both datasets; left keeps only rows of Dataset A",
+        )
     if file_a and file_b:
         try:
-            df1 = load_data(file_a)
-            df2 = load_data(file_b)
+            # Loaded one after the other: _load_upload is a cached Streamlit
+            # function and needs the script run context of this thread
+            df1 = _load_upload(file_a.file_id, file_a)
+            df2 = _load_upload(file_b.file_id, file_b)
         except Exception as e:
             st.error(f"Error loading files: {e}")
             st.stop()
         st.subheader("Comparison Result")
         try:
-            result = compare_datasets(df1, df2, join_key)
-            st.data_editor(
-                result.to_pandas(),
-                use_container_width=True,
-                num_rows="dynamic",
-            )
-            numeric_cols = [c for c in result.columns if "diff" in c]
-            if numeric_cols:
-                st.bar_chart(result.to_pandas(), x=join_key, y=numeric_cols)
+            result, diff_cols = _compare_datasets(df1, df2, join_key, join_how)
+            # Read-only view: edits were never read back, and a Polars frame
+            # goes to the browser through Arrow without a pandas copy
+            st.dataframe(result, use_container_width=True)
+            if diff_cols:
+                st.bar_chart(result, x=join_key, y=diff_cols)
         except Exception as e:
             st.error(f"Error during comparison: {e}")
 
@@ -65,13 +473,13 @@ with tab_visualize:
     )
     if chart_file:
         try:
-            df_original = load_data(chart_file)
+            df_original = _load_upload(chart_file.file_id, chart_file)
         except Exception as e:
             st.error(f"Error loading file: {e}")
             st.stop()
         st.subheader("Data Preview")
-        st.dataframe(df_original.to_pandas().head(10), use_container_width=True)
-        original_columns = list(df_original.columns)
+        st.dataframe(_preview(df_original), use_container_width=True)
+        original_columns = df_original.columns
         is_unpivot_enabled = st.checkbox(
             "Unpivot wide-format data",
             value=False,
@@ -93,7 +501,7 @@ with tab_visualize:
                 id_columns_selected = st.multiselect(
                     "Identifier Columns",
                     options=original_columns,
-                    default=list(original_columns[:2]) if len(original_columns) >= 2 else list(original_columns),
+                    default=original_columns[:2],
                     help="Columns to keep as identifiers. All other columns become values.",
                 )
             else:
@@ -130,248 +538,115 @@ with tab_visualize:
                     value="value",
                     help="Name for the column containing the values",
                 )
-            try:
-                df = unpivot_data(
-                    df=df_original,
-                    id_columns=id_columns_selected if id_columns_selected else None,
-                    value_columns_start=int(value_start_idx) if value_start_idx is not None else None,
-                    value_columns_end=int(value_end_idx) if value_end_idx is not None else None,
-                    variable_name=var_name_input,
-                    value_name=value_name_input,
-                )
-                st.subheader("Unpivoted Data Preview")
-                st.dataframe(df.to_pandas().head(10), use_container_width=True)
-            except Exception as e:
-                st.error(f"Error unpivoting data: {e}")
-                df = df_original
-        current_columns = list(df.columns)
-        with st.expander("📋 Lookup Mapping (replace codes with labels)", expanded=False):
-            lookup_file = st.file_uploader(
-                "Upload Lookup File",
-                type=["csv", "json"],
-                key="lookup_file",
-                help="CSV/JSON file containing code-to-label mappings",
-            )
-            if lookup_file:
-                try:
-                    lookup_df = load_data(lookup_file)
-                    lookup_columns = list(lookup_df.columns)
-                    st.dataframe(lookup_df.to_pandas().head(5), use_container_width=True)
-                    lookup_col1, lookup_col2, lookup_col3 = st.columns(3)
-                    with lookup_col1:
-                        lookup_source_column = st.selectbox(
-                            "Column to Replace",
-                            options=current_columns,
-                            index=0,
-                            help="Column in main data containing codes to replace",
-                            key="lookup_source",
-                        )
-                    with lookup_col2:
-                        lookup_code_column = st.selectbox(
-                            "Code Column (lookup)",
-                            options=lookup_columns,
-                            index=0,
-                            help="Column in lookup file containing codes",
-                            key="lookup_code",
-                        )
-                    with lookup_col3:
-                        default_label_idx = 1 if len(lookup_columns) > 1 else 0
-                        lookup_label_column = st.selectbox(
-                            "Label Column (lookup)",
-                            options=lookup_columns,
-                            index=default_label_idx,
-                            help="Column in lookup file containing labels",
-                            key="lookup_label",
-                        )
-                    if st.button("Apply Lookup", key="apply_lookup"):
-                        try:
-                            df = apply_lookup(
-                                df=df,
-                                lookup_df=lookup_df,
-                                source_column=lookup_source_column,
-                                code_column=lookup_code_column,
-                                label_column=lookup_label_column,
-                            )
-                            # Store the lookup mapping for filter display
-                            lookup_mapping = dict(zip(
-                                lookup_df[lookup_code_column].to_list(),
-                                lookup_df[lookup_label_column].to_list()
-                            ))
-                            if "lookup_mappings" not in st.session_state:
-                                st.session_state["lookup_mappings"] = {}
-                            st.session_state["lookup_mappings"][lookup_source_column] = lookup_mapping
-
-                            st.session_state["df_with_lookup"] = df
-                            st.success("Lookup applied successfully!")
-                            st.dataframe(df.to_pandas().head(10), use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Error applying lookup: {e}")
-                except Exception as e:
-                    st.error(f"Error loading lookup file: {e}")
-            if "df_with_lookup" in st.session_state:
-                df = st.session_state["df_with_lookup"]
-                current_columns = list(df.columns)
-        with st.expander("🔍 Filter Data (keep values)", expanded=False):
-            filter_column = st.selectbox(
-                "Filter Column",
-                options=current_columns,
-                index=0,
-                key="filter_column",
-                help="Select column to filter on",
-            )
-            unique_values = df[filter_column].unique().to_list()
-            unique_values_str = [str(v) for v in unique_values]
-
-            # Check if this column has a lookup mapping
-            lookup_mappings = st.session_state.get("lookup_mappings", {})
-            if filter_column in lookup_mappings:
-                # Create display options showing both code and label
-                reverse_mapping = {v: k for k, v in lookup_mappings[filter_column].items()}
-                display_options = []
-                for value in unique_values_str:
-                    original_code = reverse_mapping.get(value, value)
-                    display_options.append(f"{original_code} - {value}")
-                filter_display_options = display_options
-                # Create mapping from display option back to actual value
-                display_to_value = dict(zip(display_options, unique_values_str))
+            if id_columns_selected is not None and len(id_columns_selected) == len(original_columns):
+                # No value columns are left, so the unpivot would have no rows
+                st.info("Every column is an identifier column; showing the data without unpivoting")
             else:
-                filter_display_options = unique_values_str
-                display_to_value = dict(zip(unique_values_str, unique_values_str))
-
-            filter_values = st.multiselect(
-                "Values to Keep",
-                options=filter_display_options,
-                default=[],
-                help="Select values to keep (leave empty to keep all). Shows 'Code - Label' for lookup columns.",
-                key="filter_values",
-            )
-            # Convert display options back to actual values for filtering
-            actual_filter_values = [display_to_value[opt] for opt in filter_values]
-            if st.button("Apply Filter", key="apply_filter") and actual_filter_values:
                 try:
-                    df = filter_data(df=df, column=filter_column, values=actual_filter_values)
-                    st.session_state["df_filtered"] = df
-                    st.success(f"Filtered to {len(df)} rows")
-                    st.dataframe(df.to_pandas().head(10), use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error filtering data: {e}")
-            if "df_filtered" in st.session_state:
-                df = st.session_state["df_filtered"]
-                current_columns = list(df.columns)
-        with st.expander("🚫 Exclude Row Values", expanded=False):
-            exclude_column = st.selectbox(
-                "Exclude Column",
-                options=current_columns,
-                index=0,
-                key="exclude_column",
-                help="Select column to exclude values from",
-            )
-            exclude_unique_values = df[exclude_column].unique().to_list()
-            exclude_unique_values_str = [str(v) for v in exclude_unique_values]
-
-            # Check if this column has a lookup mapping
-            lookup_mappings = st.session_state.get("lookup_mappings", {})
-            if exclude_column in lookup_mappings:
-                # Create display options showing both code and label
-                reverse_mapping = {v: k for k, v in lookup_mappings[exclude_column].items()}
-                exclude_display_options = []
-                for value in exclude_unique_values_str:
-                    original_code = reverse_mapping.get(value, value)
-                    exclude_display_options.append(f"{original_code} - {value}")
-                exclude_display_to_value = dict(zip(exclude_display_options, exclude_unique_values_str))
-            else:
-                exclude_display_options = exclude_unique_values_str
-                exclude_display_to_value = dict(zip(exclude_unique_values_str, exclude_unique_values_str))
-
-            exclude_values_selected = st.multiselect(
-                "Values to Exclude",
-                options=exclude_display_options,
-                default=[],
-                help="Select row values to remove (e.g., 'Total', 'Unknown'). Shows 'Code - Label' for lookup columns.",
-                key="exclude_values",
-            )
-            # Convert display options back to actual values for exclusion
-            actual_exclude_values = [exclude_display_to_value[opt] for opt in exclude_values_selected]
-            if st.button("Apply Exclusion", key="apply_exclude") and actual_exclude_values:
-                try:
-                    df = exclude_values(df=df, column=exclude_column, values=actual_exclude_values)
-                    st.session_state["df_excluded"] = df
-                    st.success(f"Excluded values, {len(df)} rows remaining")
-                    st.dataframe(df.to_pandas().head(10), use_container_width=True)
+                    df = _unpivot_data(
+                        df=df_original,
+                        id_columns=id_columns_selected if id_columns_selected else None,
+                        value_columns_start=int(value_start_idx) if value_start_idx is not None else None,
+                        value_columns_end=int(value_end_idx) if value_end_idx is not None else None,
+                        variable_name=var_name_input,
+                        value_name=value_name_input,
+                    )
+                    st.subheader("Unpivoted Data Preview")
+                    st.dataframe(_preview(df), use_container_width=True)
                 except Exception as e:
-                    st.error(f"Error excluding values: {e}")
-            if "df_excluded" in st.session_state:
-                df = st.session_state["df_excluded"]
-                current_columns = list(df.columns)
-        with st.expander("🗑️ Drop Columns (ignore columns)", expanded=False):
-            columns_to_drop = st.multiselect(
-                "Columns to Drop",
-                options=current_columns,
+                    st.error(f"Error unpivoting data: {e}")
+                    df = df_original
+        # Each transform expander is a fragment: its widgets rerun only that
+        # section, and applying a step extends the plan and reruns the app
+        plan = _pipeline(df)
+        df = _collect_pipeline(plan)
+        _lookup_section(df)
+        # Label-to-code mappings of looked-up columns, for "Code - Label" options
+        reverse_mappings = st.session_state.get("lookup_mappings_reverse", {})
+        _filter_section(df, reverse_mappings)
+        _exclude_section(df, reverse_mappings)
+        _drop_section(df)
+        source = st.session_state["pipeline_source"]
+        if df is not source and st.button("Reset Transforms", help="Undo the lookup, filter, exclusion and drop steps"):
+            _reset_pipeline(source)
+            st.rerun()
+        columns = df.columns
+        # Chart settings only rerun the script when the form is submitted, so
+        # option lists cannot depend on other fields; all columns are offered
+        with st.form("chart_config"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                chart_type_str = st.selectbox(
+                    "Chart Type",
+                    options=["bar", "line", "scatter", "histogram", "pie"],
+                    index=0,
+                )
+            with col2:
+                x_column = st.selectbox("X-Axis Column", options=columns, index=0)
+            with col3:
+                y_column = st.selectbox(
+                    "Y-Axis Column",
+                    options=columns,
+                    index=1 if len(columns) > 1 else 0,
+                )
+            col4, col5 = st.columns(2)
+            with col4:
+                color_column = st.selectbox(
+                    "Color By (optional)",
+                    options=["None", *columns],
+                    index=0,
+                )
+            with col5:
+                chart_title = st.text_input("Chart Title (optional)", value="")
+            facet_columns = st.multiselect(
+                "Facet By (dropdown selector)",
+                options=columns,
                 default=[],
-                help="Select columns to ignore/remove from the data (e.g., 'Total', 'Subtotal')",
-                key="drop_columns",
+                help="Select one or more columns for combined dropdown (e.g., Country | Year)",
             )
-            if st.button("Drop Columns", key="apply_drop") and columns_to_drop:
-                try:
-                    df = drop_columns(df=df, columns=columns_to_drop)
-                    st.session_state["df_dropped"] = df
-                    st.success(f"Dropped {len(columns_to_drop)} column(s)")
-                    st.dataframe(df.to_pandas().head(10), use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error dropping columns: {e}")
-            if "df_dropped" in st.session_state:
-                df = st.session_state["df_dropped"]
-                current_columns = list(df.columns)
-        columns = current_columns
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            chart_type_str = st.selectbox(
-                "Chart Type",
-                options=["bar", "line", "scatter", "histogram", "pie"],
-                index=0,
+            is_downsample_enabled = st.checkbox(
+                "Downsample large line/scatter charts",
+                value=True,
+                help=f"Plot about {_CHART_MAX_POINTS:,} representative points (per color/facet group share) "
+                "instead of every row, keeping peaks and dips",
             )
-        with col2:
-            x_column = st.selectbox("X-Axis Column", options=columns, index=0)
-        with col3:
-            y_options = [c for c in columns if c != x_column]
-            y_column = st.selectbox(
-                "Y-Axis Column",
-                options=y_options,
-                index=0 if y_options else None,
-            )
-        col4, col5 = st.columns(2)
-        with col4:
-            color_column = st.selectbox(
-                "Color By (optional)",
-                options=["None"] + list(columns),
-                index=0,
-            )
-        with col5:
-            chart_title = st.text_input("Chart Title (optional)", value="")
-        facet_columns = st.multiselect(
-            "Facet By (dropdown selector)",
-            options=columns,
-            default=[],
-            help="Select one or more columns for combined dropdown (e.g., Country | Year)",
-        )
-        if st.button("Generate Chart", type="primary"):
+            is_chart_submitted = st.form_submit_button("Generate Chart", type="primary")
+        if is_chart_submitted:
             try:
                 renderer = get_renderer(selected_renderer)
                 chart_type = ChartType(chart_type_str)
-                fig = renderer.create_chart(
-                    df=df,
-                    chart_type=chart_type,
-                    x=x_column,
-                    y=y_column,
-                    title=chart_title if chart_title else None,
-                    color=color_column if color_column != "None" else None,
-                    facet_columns=facet_columns if facet_columns else None,
-                )
+                chart_df = df
+                if (
+                    is_downsample_enabled
+                    and chart_type in (ChartType.LINE, ChartType.SCATTER)
+                    and df.height > _CHART_MAX_POINTS
+                    and y_column is not None
+                    and df.schema[y_column].is_numeric()
+                ):
+                    group_columns = list(dict.fromkeys(c for c in [color_column, *facet_columns] if c != "None"))
+                    chart_df = _lttb_downsample(
+                        df, x_column, y_column, n_out=_CHART_MAX_POINTS, group=group_columns or None
+                    )
+                    st.caption(f"Showing {chart_df.height:,} of {df.height:,} points")
+                # Faceted charts combine the title with the facet value, so it is
+                # part of the build; otherwise the cached figure is built
+                # untitled and retitled, so editing the title skips the rebuild
+                chart_options = {
+                    "chart_type": chart_type,
+                    "x": x_column,
+                    "y": y_column,
+                    "title": chart_title if chart_title and facet_columns else None,
+                    "color": color_column if color_column != "None" else None,
+                    "facet_columns": facet_columns if facet_columns else None,
+                }
+                fig = _create_chart(selected_renderer, df=chart_df, **chart_options)
+                retitle = chart_title if not facet_columns else ""
+                if retitle:
+                    fig = renderer.with_title(fig, retitle)
                 st.plotly_chart(fig, use_container_width=True, height=600)
-                html_content = renderer.to_html(fig)
                 st.download_button(
                     label="Download as HTML",
-                    data=html_content,
+                    data=_chart_html(selected_renderer, retitle, df=chart_df, **chart_options),
                     file_name="chart.html",
                     mime="text/html",
                 )
@@ -385,63 +660,78 @@ with tab_network:
     )
     if network_file:
         try:
-            df = load_data(network_file)
+            df = _load_upload(network_file.file_id, network_file)
         except Exception as e:
             st.error(f"Error loading file: {e}")
             st.stop()
         st.subheader("Data Preview")
-        st.dataframe(df.to_pandas().head(10), use_container_width=True)
-        columns = list(df.columns)
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            source_col = st.selectbox(
-                "Source Column", options=columns, index=0, key="net_source"
-            )
-        with col2:
-            target_options = [c for c in columns if c != source_col]
-            target_col = st.selectbox(
-                "Target Column",
-                options=target_options,
-                index=0 if target_options else None,
-                key="net_target",
-            )
-        with col3:
-            weight_options = ["None"] + [
-                c for c in columns if c not in [source_col, target_col]
-            ]
-            weight_col = st.selectbox(
-                "Weight Column (optional)",
-                options=weight_options,
-                index=0,
-                key="net_weight",
-            )
-        col4, col5 = st.columns(2)
-        with col4:
-            layout_option = st.selectbox(
-                "Layout Algorithm",
-                options=["spring", "circular", "kamada_kawai", "shell", "random"],
-                index=0,
-            )
-        with col5:
-            network_title = st.text_input(
-                "Graph Title (optional)", value="", key="net_title"
-            )
-        if st.button("Generate Network Graph", type="primary"):
+        st.dataframe(_preview(df), use_container_width=True)
+        columns = df.columns
+        # As in the Visualize tab, settings apply when the form is submitted
+        with st.form("network_config"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                source_col = st.selectbox(
+                    "Source Column", options=columns, index=0, key="net_source"
+                )
+            with col2:
+                target_col = st.selectbox(
+                    "Target Column",
+                    options=columns,
+                    index=1 if len(columns) > 1 else 0,
+                    key="net_target",
+                )
+            with col3:
+                weight_col = st.selectbox(
+                    "Weight Column (optional)",
+                    options=["None", *columns],
+                    index=0,
+                    key="net_weight",
+                )
+            col4, col5 = st.columns(2)
+            with col4:
+                layout_option = st.selectbox(
+                    "Layout Algorithm",
+                    options=["spring", "circular", "kamada_kawai", "shell", "random", "spectral"],
+                    index=0,
+                    help="kamada_kawai gets slow beyond ~1,000 nodes and is replaced by spectral above 2,000; "
+                    "spectral handles a few thousand in seconds",
+                )
+            with col5:
+                network_title = st.text_input(
+                    "Graph Title (optional)", value="", key="net_title"
+                )
+            is_network_submitted = st.form_submit_button("Generate Network Graph", type="primary")
+        if is_network_submitted:
             try:
+                if source_col == target_col or weight_col in (source_col, target_col):
+                    raise ValueError("source, target and weight must be different columns")
+                if layout_option == "kamada_kawai":
+                    node_count = df.select(
+                        pl.col(source_col).cast(pl.Utf8).append(pl.col(target_col).cast(pl.Utf8)).n_unique()
+                    ).item()
+                    if node_count > _KAMADA_KAWAI_MAX_NODES:
+                        st.warning(
+                            f"kamada_kawai is too slow for {node_count:,} nodes; using spectral instead"
+                        )
+                        layout_option = "spectral"
                 renderer = get_renderer(selected_renderer)
-                fig = renderer.create_network(
-                    df=df,
-                    source=source_col,
-                    target=target_col,
-                    weight=weight_col if weight_col != "None" else None,
-                    title=network_title if network_title else None,
-                    layout=layout_option,
-                )
+                # Built untitled and retitled, so editing the title reuses the
+                # cached graph; the renderer also memoizes layouts per graph
+                network_options = {
+                    "source": source_col,
+                    "target": target_col,
+                    "weight": weight_col if weight_col != "None" else None,
+                    "layout": layout_option,
+                }
+                with st.spinner("Computing network layout..."):
+                    fig = _create_network(selected_renderer, df=df, **network_options)
+                if network_title:
+                    fig = renderer.with_title(fig, network_title)
                 st.plotly_chart(fig, use_container_width=True, height=600)
-                html_content = renderer.to_html(fig)
                 st.download_button(
                     label="Download as HTML",
-                    data=html_content,
+                    data=_network_html(selected_renderer, network_title, df=df, **network_options),
                     file_name="network.html",
                     mime="text/html",
                 )
@@ -0,0 +1,123 @@
+"""Behaviour tests for the Typer CLI."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner, Result
+
+import src.engine
+from src.cli import _format_rows, app
+
+
+def test_format_rows_matches_str_for_nested_and_boolean_values() -> None:
+    df = pl.DataFrame({
+        "tags": [[1, 2], None],
+        "meta": [{"a": 1}, {"a": None}],
+        "flag": [True, None],
+        "value": [1.5, None],
+    })
+
+    assert _format_rows(df) == [
+        ("[1, 2]", "{'a': 1}", "True", "1.5"),
+        ("None", "{'a': None}", "None", "None"),
+    ]
+
+
+def test_all_commands_are_registered() -> None:
+    names = {command.name or command.callback.__name__ for command in app.registered_commands}
+
+    assert names == {"compare", "chart", "network", "renderers"}
+
+
+def test_compare_prints_nested_columns(tmp_path: Path) -> None:
+    file_a = tmp_path / "a.json"
+    file_b = tmp_path / "b.json"
+    pl.DataFrame({"id": [1], "value": [3], "tags": [["x", "y"]]}).write_json(file_a)
+    pl.DataFrame({"id": [1], "value": [1], "tags": [["x"]]}).write_json(file_b)
+
+    result = CliRunner().invoke(app, ["compare", str(file_a), str(file_b)])
+
+    assert result.exit_code == 0, result.output
+    assert "['x', 'y']" in result.output
+
+
+def test_compare_left_join_drops_rows_only_in_the_second_file(tmp_path: Path) -> None:
+    file_a = tmp_path / "a.csv"
+    file_b = tmp_path / "b.csv"
+    pl.DataFrame({"id": [1], "value": [3]}).write_csv(file_a)
+    pl.DataFrame({"id": [1, 2], "value": [1, 5]}).write_csv(file_b)
+
+    result = CliRunner().invoke(app, ["compare", str(file_a), str(file_b), "--how", "left"])
+
+    assert result.exit_code == 0, result.output
+    assert "Showing top 20 of 1 rows" in result.output
+
+
+def _chart(tmp_path: Path, *options: str) -> Result:
+    data = tmp_path / "data.csv"
+    pl.DataFrame(
+        {"category": ["a", "b"], "value": [1, 2], "group": ["g", "h"], "unused": [0, 0]}
+    ).write_csv(data)
+    return CliRunner().invoke(app, [
+        "chart", str(data), "--x", "category", "--y", "value",
+        "-o", str(tmp_path / "chart.html"), *options,
+    ])
+
+
+def test_chart_selects_only_referenced_columns(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    executed: list[list[str]] = []
+    execute = src.engine.execute
+
+    def recording_execute(df: pl.LazyFrame) -> pl.DataFrame:
+        executed.append(df.collect_schema().names())
+        return execute(df)
+
+    monkeypatch.setattr(src.engine, "execute", recording_execute)
+    result = _chart(tmp_path, "--filter", "group:g", "--drop-columns", "unused")
+
+    assert result.exit_code == 0, result.output
+    assert executed == [["category", "value", "group"]]
+
+
+@pytest.mark.parametrize("option", ["--filter", "--exclude"])
+def test_chart_reports_misspelled_filter_columns(tmp_path: Path, option: str) -> None:
+    result = _chart(tmp_path, option, "grp:g")
+
+    assert isinstance(result.exception, ValueError)
+    assert str(result.exception) == "Columns not found: grp"
+
+
+def test_chart_reports_misspelled_drop_columns(tmp_path: Path) -> None:
+    result = _chart(tmp_path, "--drop-columns", "unusd")
+
+    assert isinstance(result.exception, ValueError)
+    assert str(result.exception) == "Columns not found: unusd"
+
+
+@pytest.mark.parametrize("command", ["compare", "chart", "network"])
+def test_low_memory_option_reaches_load_data(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, command: str
+) -> None:
+    data = tmp_path / "data.csv"
+    pl.DataFrame({"id": [1, 2], "value": [3, 4]}).write_csv(data)
+    options: list[object] = []
+    load_data = src.engine.load_data
+
+    def recording_load_data(source: str, **kwargs: object) -> object:
+        options.append(kwargs.get("low_memory"))
+        return load_data(source, **kwargs)
+
+    monkeypatch.setattr(src.engine, "load_data", recording_load_data)
+    args = {
+        "compare": ["compare", str(data), str(data)],
+        "chart": ["chart", str(data), "--x", "id", "--y", "value"],
+        "network": ["network", str(data), "--source", "id", "--target", "value"],
+    }[command]
+    output = ["-o", str(tmp_path / "out.html")] if command != "compare" else []
+    result = CliRunner().invoke(app, [*args, *output, "--low-memory"])
+
+    assert result.exit_code == 0, result.output
+    assert options and all(options)
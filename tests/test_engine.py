@@ -0,0 +1,291 @@
+"""Behaviour tests for the Polars data engine."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+from src import engine
+from src.engine import (
+    apply_lookup,
+    compare_datasets,
+    drop_columns,
+    execute,
+    filter_rows,
+    load_data,
+    lttb_downsample,
+    unpivot_data,
+)
+
+
+def test_compare_datasets_diffs_unsigned_columns_without_wrapping() -> None:
+    df_a = pl.DataFrame({"id": [1, 2], "count": pl.Series([1, 5], dtype=pl.UInt8)})
+    df_b = pl.DataFrame({"id": [1, 2], "count": pl.Series([2, 3], dtype=pl.UInt8)})
+
+    result, diff_cols = compare_datasets(df_a, df_b, "id")
+
+    assert diff_cols == ["count_diff"]
+    assert result.sort("id")["count_diff"].to_list() == [-1, 2]
+
+
+def test_compare_datasets_diffs_64_bit_integers_beyond_int64() -> None:
+    big = 2**63 + 10
+    df_a = pl.DataFrame({"id": [1, 2], "count": pl.Series([big, 0], dtype=pl.UInt64)})
+    df_b = pl.DataFrame({"id": [1, 2], "count": pl.Series([0, big], dtype=pl.UInt64)})
+
+    result, _diff_cols = compare_datasets(df_a, df_b, "id")
+
+    assert result.sort("id")["count_diff"].to_list() == [float(big), -float(big)]
+
+
+def test_compare_datasets_keeps_lazy_inputs_lazy() -> None:
+    df_a = pl.LazyFrame({"id": [1], "value": [1.5]})
+    df_b = pl.LazyFrame({"id": [1], "value": [0.5]})
+
+    result, _diff_cols = compare_datasets(df_a, df_b, "id")
+
+    assert isinstance(result, pl.LazyFrame)
+    assert result.collect()["value_diff"].to_list() == [1.0]
+
+
+def _wave(rows: int) -> pl.DataFrame:
+    x = np.arange(rows)
+    return pl.DataFrame({"x": x, "y": np.sin(x / 50.0), "group": np.where(x % 4 == 0, "a", "b")})
+
+
+def test_lttb_downsample_returns_at_most_n_out_rows_keeping_the_ends() -> None:
+    df = _wave(10_000)
+
+    result = lttb_downsample(df, "x", "y", n_out=100)
+
+    assert result.height <= 100
+    assert result["x"][0] == 0
+    assert result["x"][-1] == 9_999
+    assert result["x"].is_sorted()
+
+
+def test_lttb_downsample_keeps_the_peak() -> None:
+    df = _wave(10_000).with_columns(
+        pl.when(pl.col("x") == 5_000).then(100.0).otherwise(pl.col("y")).alias("y")
+    )
+
+    result = lttb_downsample(df, "x", "y", n_out=100)
+
+    assert result["y"].max() == 100.0
+
+
+def test_lttb_downsample_returns_small_frames_unchanged() -> None:
+    df = _wave(50)
+
+    assert lttb_downsample(df, "x", "y", n_out=100) is df
+
+
+def test_lttb_downsample_handles_all_null_values() -> None:
+    df = pl.DataFrame({"x": np.arange(500), "y": pl.Series([None] * 500, dtype=pl.Float64)})
+
+    result = lttb_downsample(df, "x", "y", n_out=100)
+
+    assert result.height == 0
+    assert result.columns == ["x", "y"]
+
+
+def test_lttb_downsample_drops_nan_values() -> None:
+    df = _wave(10_000).with_columns(
+        pl.when(pl.col("x") % 3 == 0).then(float("nan")).otherwise(pl.col("y")).alias("y")
+    )
+
+    result = lttb_downsample(df, "x", "y", n_out=100)
+
+    assert 0 < result.height <= 100
+    assert not result["y"].is_nan().any()
+
+
+def test_lttb_downsample_samples_each_group() -> None:
+    df = _wave(10_000)
+
+    result = lttb_downsample(df, "x", "y", n_out=100, group=["group"])
+
+    assert result.height <= 100
+    assert set(result["group"]) == {"a", "b"}
+    for _, part in result.group_by("group"):
+        assert part.height > 3
+
+
+def test_lttb_downsample_stays_within_n_out_with_many_groups() -> None:
+    x = np.arange(1_000)
+    df = pl.DataFrame({"x": x, "y": np.cos(x), "group": x % 40})
+
+    result = lttb_downsample(df, "x", "y", n_out=20, group=["group"])
+
+    assert result.height <= 20
+
+
+def test_execute_collects_a_plan() -> None:
+    plan = pl.LazyFrame({"a": [1, 2, 3]}).filter(pl.col("a") > 1)
+
+    assert execute(plan)["a"].to_list() == [2, 3]
+    assert execute(plan, streaming=False)["a"].to_list() == [2, 3]
+
+
+def test_execute_runs_a_failing_plan_once() -> None:
+    calls = []
+
+    def fail(series: pl.Series) -> pl.Series:
+        calls.append(series)
+        raise ValueError("bad value")
+
+    plan = pl.LazyFrame({"a": [1]}).select(pl.col("a").map_batches(fail, return_dtype=pl.Int64))
+
+    with pytest.raises(Exception, match="bad value"):
+        execute(plan)
+    assert len(calls) == 1
+
+
+def test_load_data_low_memory_is_opt_in(tmp_path: Path) -> None:
+    path = tmp_path / "data.csv"
+    pl.DataFrame({"a": [1, 2], "b": ["x", "y"]}).write_csv(path)
+
+    default = load_data(str(path))
+    low_memory = load_data(str(path), low_memory=True)
+
+    assert default.equals(low_memory)
+    assert load_data(str(path), lazy=True, low_memory=True).collect().equals(default)
+
+
+def test_filter_rows_parses_values_to_the_column_dtype() -> None:
+    df = pl.DataFrame({"year": [2019, 2020, 2021], "score": [1.5, 2.0, 2.5]})
+
+    result = filter_rows(
+        df, keep=[("year", ["2020", "2021", "soon"])], exclude=[("score", ["2.5"])]
+    )
+
+    assert result["year"].to_list() == [2020]
+
+
+def test_filter_rows_matches_strings_and_other_dtypes_as_text() -> None:
+    df = pl.DataFrame({"country": ["BG", "DE", "DK"], "active": [True, False, True]})
+
+    result = filter_rows(
+        df, keep=[("country", ["BG", "DK"])], exclude=[("active", ["false"])]
+    )
+
+    assert result["country"].to_list() == ["BG", "DK"]
+
+
+def test_filter_rows_rejects_unknown_columns() -> None:
+    df = pl.DataFrame({"a": [1]})
+
+    with pytest.raises(ValueError, match="Columns not found: b"):
+        filter_rows(df, keep=[("b", ["1"])])
+
+
+def test_filter_rows_without_conditions_returns_the_frame() -> None:
+    df = pl.DataFrame({"a": [1, 2]})
+
+    assert filter_rows(df) is df
+
+
+def test_load_data_reloads_a_file_after_it_changes(tmp_path: Path) -> None:
+    path = tmp_path / "data.csv"
+    pl.DataFrame({"a": [1]}).write_csv(path)
+    first = load_data(str(path))
+
+    assert load_data(str(path)) is first
+
+    pl.DataFrame({"a": [1, 2]}).write_csv(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+    assert load_data(str(path))["a"].to_list() == [1, 2]
+
+
+def test_load_data_reads_through_the_ipc_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "data.csv"
+    pl.DataFrame({"a": [1, 2], "b": ["x", "y"]}).write_csv(path)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("VIZ_CACHE", "1")
+    monkeypatch.setattr(engine, "_CACHE_DIR", cache_dir)
+
+    written = load_data(str(path))
+    cached = list(cache_dir.glob("*.arrow"))
+    read_back = load_data(str(path), lazy=True).collect()
+
+    assert len(cached) == 1
+    assert pl.read_ipc(cached[0]).equals(written)
+    assert read_back.equals(written)
+
+
+def test_load_data_caches_whole_files_before_selecting_columns(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "data.csv"
+    pl.DataFrame({"a": [1, 2], "b": ["x", "y"]}).write_csv(path)
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("VIZ_CACHE", "1")
+    monkeypatch.setenv("VIZ_NO_CACHE", "1")
+    monkeypatch.setattr(engine, "_CACHE_DIR", cache_dir)
+
+    written = load_data(str(path), columns=["b"])
+    cached = list(cache_dir.glob("*.arrow"))
+    read_back = load_data(str(path), lazy=True, columns=["b"]).collect()
+
+    assert len(cached) == 1
+    assert pl.read_ipc(cached[0]).columns == ["a", "b"]
+    assert written.equals(read_back)
+    assert read_back.columns == ["b"]
+
+
+def test_load_data_loads_only_the_requested_columns(tmp_path: Path) -> None:
+    path = tmp_path / "data.parquet"
+    pl.DataFrame({"a": [1], "b": [2], "c": [3]}).write_parquet(path)
+
+    assert load_data(str(path), columns=["c", "a"]).columns == ["c", "a"]
+    assert load_data(str(path), lazy=True, columns=["b"]).collect().columns == ["b"]
+
+
+def test_unpivot_data_chunks_wide_frames_in_column_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    columns = {f"v{i}": [i, -i] for i in range(1500)}
+    df = pl.DataFrame({"id": ["a", "b"], **columns})
+
+    result = unpivot_data(df, id_columns=["id"])
+
+    assert result.height == 2 * 1500
+    expected = [f"v{i}" for i in range(1500) for _ in range(2)]
+    assert result["variable"].to_list() == expected
+    assert result.filter(pl.col("id") == "b")["value"].sum() == -sum(range(1500))
+
+
+def test_unpivot_data_by_value_column_range() -> None:
+    df = pl.DataFrame({"name": ["x"], "code": [1], "2020": [3], "2021": [4]})
+
+    result = unpivot_data(df, value_columns_start=2, variable_name="year")
+
+    assert result.columns == ["name", "code", "year", "value"]
+    assert result["year"].to_list() == ["2020", "2021"]
+
+
+def test_apply_lookup_keeps_unmatched_codes_and_uses_the_first_label() -> None:
+    df = pl.DataFrame({"code": ["BG", "XX", "DE"], "value": [1, 2, 3]})
+    lookup = pl.DataFrame(
+        {"code": ["BG", "DE", "BG"], "label": ["Bulgaria", "Germany", "Other"]}
+    )
+
+    result = apply_lookup(df, lookup, "code", "code", "label")
+
+    assert result.columns == ["code", "value"]
+    assert result.sort("value")["code"].to_list() == ["Bulgaria", "XX", "Germany"]
+
+
+def test_drop_columns_rejects_unknown_columns() -> None:
+    df = pl.DataFrame({"a": [1], "b": [2]})
+
+    assert drop_columns(df, ["b"]).columns == ["a"]
+    assert drop_columns(df.lazy(), ["b"]).collect_schema().names() == ["a"]
+    with pytest.raises(ValueError, match="Columns not found: c"):
+        drop_columns(df, ["b", "c"])
@@ -0,0 +1,63 @@
+"""Behaviour tests for the Plotly renderer."""
+
+import polars as pl
+import pytest
+
+from src.graphs import ChartType, get_renderer, plotly_renderer
+
+
+def test_to_html_reflects_in_place_changes() -> None:
+    renderer = get_renderer("plotly")
+    figure = renderer.create_chart(
+        pl.DataFrame({"x": ["a", "b"], "y": [1, 2]}), ChartType.BAR, "x", "y"
+    )
+    renderer.to_html(figure)
+
+    figure.update_layout(title_text="Updated title")
+
+    assert "Updated title" in renderer.to_html(figure)
+
+
+def test_binned_histogram_counts_rows_with_null_colour(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(plotly_renderer, "_HISTOGRAM_PREBIN_ROWS", 1)
+    df = pl.DataFrame({"x": [1.0, 2.0, 3.0, 4.0], "group": ["a", None, "b", None]})
+
+    figure = get_renderer("plotly").create_chart(
+        df, ChartType.HISTOGRAM, "x", "x", color="group"
+    )
+
+    assert [trace.name for trace in figure.data] == ["a", "b", "None"]
+    assert sum(int(sum(trace.y)) for trace in figure.data) == df.height
+
+
+def test_create_chart_keeps_columns_named_by_hover_data_dicts() -> None:
+    df = pl.DataFrame({"x": [1, 2], "y": [3, 4], "label": ["a", "b"], "unused": [0, 0]})
+
+    figure = get_renderer("plotly").create_chart(
+        df, ChartType.SCATTER, "x", "y", hover_data={"label": True}
+    )
+
+    assert [list(row) for row in figure.data[0].customdata] == [["a"], ["b"]]
+
+
+@pytest.mark.parametrize("facets", [["region"], ["region", "year"]])
+def test_faceted_chart_keeps_null_facets_apart_from_none_strings(facets: list[str]) -> None:
+    df = pl.DataFrame({
+        "x": ["a", "b", "c", "d"],
+        "y": [1, 2, 4, 8],
+        "region": ["None", None, "None", "north"],
+        "year": [2020, 2020, 2020, 2020],
+    })
+
+    figure = get_renderer("plotly").create_chart(
+        df, ChartType.BAR, "x", "y", facet_columns=facets
+    )
+
+    buttons = figure.layout.updatemenus[0].buttons
+    suffix = " | 2020" if len(facets) == 2 else ""
+    assert [button.label for button in buttons] == [
+        f"None{suffix}", f"None{suffix}", f"north{suffix}"
+    ]
+    assert [list(button.args[0]["y"][0]) for button in buttons] == [[1, 4], [2], [8]]